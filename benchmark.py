@@ -0,0 +1,110 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+from src.combine import combine_exports, dump_postprocessed_json, postprocess_dict
+from src.output import dumps_json
+from src.parse import parse_export
+from src.synthetic import PROPERTY_TYPES, SyntheticAsset
+from src.uasset import UAsset
+
+# Offline parser throughput on synthetic assets: MB/s and rows/s per property type and per pipeline stage
+
+def measure(func, repeat):
+    # Best of `repeat` runs
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def report_entry(name, seconds, size, rows):
+    return {
+        "name": name,
+        "seconds": seconds,
+        "bytes": size,
+        "rows": rows,
+        "mb_per_s": size / seconds / 1e6 if seconds else None,
+        "rows_per_s": rows / seconds if seconds else None,
+    }
+
+def bench_property_types(args):
+    entries = []
+    mixes = [("Baseline", [])] + [(value_type, [value_type]) for value_type in PROPERTY_TYPES]
+    for name, mix in mixes:
+        asset = SyntheticAsset(args.rows, mix, args.array_size, args.map_size, args.names, args.seed)
+        export = asset.export()
+        seconds, _ = measure(lambda: parse_export("Synthetic", export, asset.names), args.repeat)
+        entries.append(report_entry(name, seconds, len(export), args.rows))
+    return entries
+
+def bench_pipeline(args, folder):
+    asset = SyntheticAsset(args.rows, PROPERTY_TYPES, args.array_size, args.map_size, args.names, args.seed)
+    path = asset.write(os.path.join(folder, "Synthetic.uasset"), args.exports)
+    file_size = os.path.getsize(path)
+    rows = args.rows * args.exports
+    entries = []
+
+    def open_asset():
+        uasset = UAsset(path).init_uasset()
+        exports = [(name, bytes(data)) for name, data in uasset.exports]
+        uasset.close()
+        return uasset.name_table, exports
+    seconds, (name_table, exports) = measure(open_asset, args.repeat)
+    entries.append(report_entry("open", seconds, file_size, rows))
+
+    export_size = sum(len(data) for _, data in exports)
+    seconds, parsed = measure(lambda: [(name, parse_export(name, data, name_table)) for name, data in exports], args.repeat)
+    entries.append(report_entry("parse", seconds, export_size, rows))
+
+    for profile, compact in (("encode_pretty", False), ("encode_compact", True)):
+        seconds, encoded = measure(lambda: [dumps_json(content, compact) for _, content in parsed], args.repeat)
+        entries.append(report_entry(profile, seconds, sum(len(text.encode("utf-8")) for text in encoded), rows))
+
+    seconds, combined = measure(lambda: combine_exports(parsed, {"OtherCategories": {}}), args.repeat)
+    entries.append(report_entry("combine", seconds, export_size, rows))
+
+    seconds, _ = measure(lambda: postprocess_dict(combined), args.repeat)
+    entries.append(report_entry("postprocess", seconds, export_size, rows))
+
+    for profile, compact in (("emit_pretty", False), ("emit_compact", True)): # Streamed postprocess + encode, as main.py writes it
+        seconds, _ = measure(lambda: dump_postprocessed_json(combined, io.StringIO(), compact), args.repeat)
+        entries.append(report_entry(profile, seconds, export_size, rows))
+    return entries
+
+def print_entries(title, entries):
+    print(title)
+    for entry in entries:
+        print(f"  {entry['name']:<20} {entry['seconds'] * 1000:>10.2f} ms {entry['mb_per_s']:>10.2f} MB/s {entry['rows_per_s']:>12.0f} rows/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the deserializer on synthetic assets")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--exports", type=int, default=2)
+    parser.add_argument("--array-size", type=int, default=8)
+    parser.add_argument("--map-size", type=int, default=4)
+    parser.add_argument("--names", type=int, default=1024, help="Name table size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default="", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        report = {
+            "config": vars(args),
+            "property_types": bench_property_types(args),
+            "pipeline": bench_pipeline(args, folder),
+        }
+
+    print_entries("Per property type (parse_export)", report["property_types"])
+    print_entries("Per pipeline stage", report["pipeline"])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
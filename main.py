@@ -1,10 +1,59 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
 import json
+import logging
+from multiprocessing.util import Finalize
 import os
+import shutil
 import sys
+import tempfile
 
-from src.parse import extract_uasset, parse_export
-from src.combine import combine, postprocess_dict
+from src.parse import extract_uasset, parse_export, parse_exports
+from src.combine import combine, combine_export, combine_exports, dump_postprocessed_json, postprocess_dict
+from src.cache import ParseCache
+from src.output import BackgroundWriter, dump_json
+from src.catalog import AssetCatalog
+from src.reader import UAssetSerializer
+from src.profiler import PropertyProfiler
+from src.dumps import ZipSink
+from src.incremental import IncrementalCombine
+from src.item_store import ItemStore
+
+def pop_option(name, default=None):
+    if name not in sys.argv:
+        return default
+    idx = sys.argv.index(name)
+    sys.argv.pop(idx)
+    if idx >= len(sys.argv):
+        print(f"Option {name} requires a value")
+        exit(1)
+    return sys.argv.pop(idx)
+
+def pop_flag(name):
+    if name not in sys.argv:
+        return False
+    sys.argv.remove(name)
+    return True
+
+jobs = int(pop_option("--jobs", 1))
+force_parse = pop_flag("--force") # Ignore the parse cache and re-parse every file
+pipeline = pop_flag("--pipeline") # Feed parsed exports straight into combine instead of going through processed/parsed
+keep_parsed = pop_flag("--write-parsed") # With --pipeline, still write the intermediate parsed files
+compact = pop_flag("--compact") # Compact streamed JSON instead of indented output
+profile_properties = pop_flag("--profile-properties") # Per property/struct type decode stats, written to property_profile.json
+verbose = pop_flag("--verbose") # Progress per file and export
+debug = pop_flag("--debug") # Everything the decoder reports, per struct and row
+use_catalog = pop_flag("--catalog") # Only parse assets whose headers mention a supported class, per processed/catalog.sqlite
+dump_archive = pop_flag("--dump-archive") # processed/dumps-<timestamp>-<pid>.zip per process instead of the processed/extracted tree
+write_queue = int(pop_option("--write-queue", 64)) # Outputs waiting for the background writer before parsing blocks
+use_sqlite = pop_flag("--sqlite") # Combined items go to an indexed combined_data/<timestamp>-<name>.sqlite instead of JSON, see src/item_store.py
+memory_map = pop_flag("--mmap") # Read assets through a memory mapping, exports are decoded straight from it
+incremental = pop_flag("--incremental") # Only re-combine parsed files (and re-encode categories) that changed since the last run, per processed/combine_state
+
+logging.basicConfig(level=logging.DEBUG if debug else logging.INFO if verbose else logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("main")
 
 argc = len(sys.argv)
 
@@ -20,38 +69,173 @@ if argc > 2:
 else:
     extract_only = parse_only = False
 
-def extract_and_process_uasset(file_path: str, dump_raw: bool = False, dump_parsed: bool = False, dump_loc: str = ""):
+def extract_and_process_uasset(file_path: str, dump_raw: bool = False, dump_parsed: bool = False, dump_loc: str = "", memory_map: bool = False, export_jobs: int = 1, dump_sink = None):
     file = os.path.dirname(file_path)
-    for file_name, file_data, name_table in extract_uasset(file_path, dump_raw, dump_parsed, dump_loc):
-        print(f"Processing export {file_name} for {file}")
+    if export_jobs > 1: # Exports of one asset decoded concurrently
+        yield from parse_exports(file_path, export_jobs, True, dump_raw, dump_parsed, dump_loc, memory_map, dump_sink)
+        logger.info("file %s done processing!", file_path)
+        return
+    for file_name, file_data, name_table in extract_uasset(file_path, dump_raw, dump_parsed, dump_loc, memory_map, dump_sink):
+        logger.info("Processing export %s for %s", file_name, file)
         content = parse_export(file_name, file_data, name_table)
         yield file_name, content
         
-    print(f"file {file_path} done processing!")
+    logger.info("file %s done processing!", file_path)
+
+_dump_sink = None # This process' dump archive, see open_dump_archive
+
+def open_dump_archive(archive: str):
+    # Dumps of every asset this process handles go to its own `<archive>-<pid>.zip`, never through the parent
+    # Also the pool initializer, the returned finalizer closes the archive early and otherwise runs when the process exits
+    global _dump_sink
+    _dump_sink = ZipSink(f"{archive}-{os.getpid()}.zip")
+    return Finalize(_dump_sink, _dump_sink.close, exitpriority=10)
+
+def process_file(file_path: str, extract_folder: str, export_jobs: int = 1, staging_folder: str = "", compact: bool = False, profile: bool = False, memory_map: bool = False, on_export = None):
+    # Runs in worker processes. With `staging_folder` the worker streams each export's JSON to a temporary file there
+    # and only (export_name, temp path) travels back, for the parent to move into place in input order
+    # Otherwise the parsed dicts are returned as is, for the fused pipeline
+    # With `on_export` (in-process only) every export is handed over as soon as it's parsed instead of being collected
+    export_names = []
+    outputs = []
+    error = None
+    if profile:
+        UAssetSerializer.profiler = PropertyProfiler()
+    exports = extract_and_process_uasset(file_path, True, True, extract_folder, memory_map, export_jobs, _dump_sink)
+    try:
+        while True:
+            try: # Only decode errors are the asset's own, combine and write errors below stop the run
+                export_name, content = next(exports)
+            except StopIteration:
+                break
+            except Exception as e:
+                logger.error("Error with %s: %s", file_path, e)
+                error = {"file": file_path, "error": str(e)}
+                break
+            export_names.append(export_name)
+            if on_export:
+                on_export(export_name, content)
+            elif staging_folder:
+                outputs.append((export_name, stage_parsed(staging_folder, export_name, content, compact)))
+            else:
+                outputs.append((export_name, content))
+    finally:
+        exports.close()
+        profiler = UAssetSerializer.profiler if profile else None
+        if profile:
+            UAssetSerializer.profiler = None
+    return export_names, outputs, error, profiler.report() if profiler else None
+
+def bounded_map(executor, func, items, window: int):
+    # executor.map, but with at most `window` calls submitted ahead of the consumer, results in input order
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, item))
+    while pending:
+        yield pending.popleft().result()
+
+def handle_export(writer: BackgroundWriter, global_data, parsed_save_folder: str, export_name: str, payload):
+    if pipeline:
+        combine_exports([(export_name, payload)], global_data)
+    if not pipeline or keep_parsed:
+        writer.submit(write_parsed, parsed_save_folder, export_name, payload, compact)
+
+def write_parsed(parsed_save_folder: str, export_name: str, content, compact: bool = False):
+    with open(os.path.join(parsed_save_folder, export_name + ".json"), "w", encoding="utf-8") as f:
+        dump_json(content, f, compact) # Streamed, the document never exists as one string
+
+def stage_parsed(staging_folder: str, export_name: str, content, compact: bool = False):
+    # write_parsed to a unique temporary file, so assets with an export of the same name never race for it
+    fd, path = tempfile.mkstemp(".json", export_name + ".", staging_folder)
+    with open(fd, "w", encoding="utf-8") as f:
+        dump_json(content, f, compact)
+    return path
 
 if __name__ == "__main__":
     parsed_save_folder = os.path.join("processed", "parsed")
     extract_folder = os.path.join("processed", "extracted")
+    staging_folder = os.path.join("processed", "staging") # Parsed files written by workers, until they're moved in input order
 
     os.makedirs(parsed_save_folder, exist_ok=True)
     os.makedirs(extract_folder, exist_ok=True)
 
+    pipeline = pipeline and not (parse_only or extract_only)
+    if pipeline and incremental:
+        logger.warning("--incremental combines processed/parsed, ignoring it with --pipeline")
+    global_data = {"OtherCategories": {}}
+
     if not parse_only:
         if os.path.isdir(in_file):
             files = [os.path.join(in_file, f) for f in os.listdir(in_file)]
         else:
             files = [in_file]
 
+        if use_catalog:
+            with AssetCatalog(os.path.join("processed", "catalog.sqlite")) as catalog:
+                logger.info("Scanned %d new or modified files into the catalog", catalog.scan(files))
+                relevant = set(catalog.select(names=sorted(UAssetSerializer.SUPPORTED_CLASSES)))
+            files = [file for file in files if os.path.abspath(file) in relevant]
+
+        cache = ParseCache(os.path.join("processed", "cache.json"), parsed_save_folder, force_parse, compact)
+        signatures = {file: cache.signature(file) for file in files if os.path.isfile(file)} # Only new or touched inputs are read
+        pending = [file for file in files if cache.lookup(file, signatures.get(file)) is None]
+        logger.info("Reusing cached output of %d unchanged files", len(files) - len(pending))
+        if pipeline:
+            for file in files:
+                if file in pending:
+                    continue
+                for export_name in cache.lookup(file, signatures[file]):
+                    with open(os.path.join(parsed_save_folder, export_name + ".json"), encoding="utf-8") as f:
+                        combine_export(export_name + ".json", json.load(f), global_data)
+        files = pending
+
         errors = []
-        for file in files:
+        profiler = PropertyProfiler() if profile_properties else None
+        archive = os.path.join("processed", f"dumps-{datetime.now().timestamp()}") if dump_archive else ""
+        writer = BackgroundWriter(write_queue) # Owns every write below, in order
+        on_export = partial(handle_export, writer, global_data, parsed_save_folder)
+        close_archive = None
+        if len(files) == 1 or jobs == 1: # In-process, each export goes to the writer as soon as it's parsed
+            executor = None
+            export_jobs = jobs if len(files) == 1 and not profiler else 1 # One file: spread its exports instead (profiling stays in-process)
+            if archive:
+                close_archive = open_dump_archive(archive)
+            results = (process_file(file, extract_folder, export_jobs, "", compact, profile_properties, memory_map, on_export) for file in files)
+        else: # Workers stage their own parsed files, at most 2 files per worker ahead of the consumer
+            if not pipeline:
+                shutil.rmtree(staging_folder, ignore_errors=True) # Leftovers of an interrupted run
+                os.makedirs(staging_folder)
+            executor = ProcessPoolExecutor(jobs, initializer=open_dump_archive if archive else None, initargs=(archive,))
+            worker = partial(process_file, extract_folder=extract_folder, staging_folder="" if pipeline else staging_folder, compact=compact, profile=profile_properties, memory_map=memory_map)
+            results = bounded_map(executor, worker, files, jobs * 2)
+        try:
+            for file, (export_names, outputs, error, profile) in zip(files, results): # In input order, so outputs and errors stay deterministic
+                if profiler and profile:
+                    profiler.merge(profile)
+                for export_name, payload in outputs:
+                    if executor and not pipeline: # Staged by the worker, the last asset in input order wins a shared export name
+                        writer.submit(os.replace, payload, os.path.join(parsed_save_folder, export_name + ".json"))
+                    else:
+                        on_export(export_name, payload)
+                if error or (pipeline and not keep_parsed): # Nothing on disk to reuse next time
+                    cache.invalidate(file)
+                else: # Queued after its writes, so a failed write never gets cached
+                    writer.submit(cache.store, file, signatures[file], export_names)
+                if error:
+                    errors.append(error)
+        finally:
+            if executor: # Workers close their archives on exit
+                executor.shutdown()
+            if close_archive:
+                close_archive()
             try:
-                for export_name, content in extract_and_process_uasset(file, True, True, extract_folder):
-                    with open(os.path.join(parsed_save_folder, export_name + ".json"), "w", encoding="utf-8") as f:
-                        json.dump(content, f, ensure_ascii=False, indent=4)
-            except Exception as e:
-                print(f"Error with {file}")
-                print(e)
-                errors.append({"file": file, "error": str(e)})
+                writer.close() # Flushes the queue, raises the first failed write
+            finally:
+                cache.save()
+                if profiler:
+                    profiler.write("property_profile.json")
 
         with open("errors.json", "w", encoding="utf-8") as f:
             json.dump(errors, f, indent=4, ensure_ascii=False)
@@ -59,20 +243,33 @@ if __name__ == "__main__":
         if extract_only:
             exit(0)
 
-    global_data = combine(parsed_save_folder, {"OtherCategories": {}})
-    global_data = postprocess_dict(global_data)
+    state = None
+    if not pipeline and incremental:
+        state = IncrementalCombine(os.path.join("processed", "combine_state"), force_parse, compact)
+        applied, retracted = state.update(parsed_save_folder)
+        logger.info("Combined %d new or changed files, retracted %d removed files", applied, retracted)
+        state.save()
+    elif not pipeline:
+        global_data = combine(parsed_save_folder, global_data)
 
     out_folder = "combined_data"
     os.makedirs(out_folder, exist_ok=True)
     out_file = os.path.basename(in_file.replace("\\", "/").rstrip("/"))
-    with open(
-        os.path.join(
-            out_folder, f"{datetime.now().timestamp()}-{out_file}.json"
-        ),
-        "w+",
-        encoding="utf-8",
-    ) as f:
-        json.dump(global_data, f, ensure_ascii=False, indent=4)
+    if use_sqlite:
+        with ItemStore(os.path.join(out_folder, f"{datetime.now().timestamp()}-{out_file}.sqlite")) as store:
+            logger.info("Stored %d items", store.write(postprocess_dict(state.global_data() if state else global_data)))
+    else:
+        with open(
+            os.path.join(
+                out_folder, f"{datetime.now().timestamp()}-{out_file}.json"
+            ),
+            "w+",
+            encoding="utf-8",
+        ) as f:
+            if state: # Copied from the per-category outputs the state keeps encoded
+                state.write(f)
+            else:
+                dump_postprocessed_json(global_data, f, compact) # Sorted and pruned while writing, no second copy of the tree
 
 
 # TODO: Missing handling when there are actual currency prices so try on gear or something
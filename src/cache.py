@@ -0,0 +1,92 @@
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+PARSER_SOURCES = ["reader.py", "uasset.py", "parse.py", "output.py"]
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_version(sources):
+    src_folder = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.blake2b(digest_size=8)
+    for source in sources:
+        with open(os.path.join(src_folder, source), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def parser_version():
+    # Any edit to the deserializer sources invalidates every cached entry
+    return source_version(PARSER_SOURCES)
+
+def file_signature(file_path: str, previous = None):
+    # {"size", "mtime_ns", "hash"}, the hash reused from `previous` while size and mtime still match
+    stat = os.stat(file_path)
+    signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if previous and all(previous.get(key) == value for key, value in signature.items()):
+        return {**signature, "hash": previous["hash"]}
+    signature["hash"] = hash_file(file_path)
+    return signature
+
+class ParseCache:
+    # Manifest of {file_path: {"size", "mtime_ns", "hash", "exports": {export_name: signature}}} for inputs whose parsed output is already on disk
+    # Export signatures catch parsed files overwritten since, e.g. by another asset's export of the same name
+    def __init__(self, manifest_path: str, output_folder: str, force: bool = False, compact: bool = False):
+        self.manifest_path = manifest_path
+        self.output_folder = output_folder
+        self.version = f"{parser_version()}-{'compact' if compact else 'indented'}" # Never mix output formats in one folder
+        self.entries = {}
+        if not force and os.path.isfile(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == self.version:
+                self.entries = manifest.get("files", {})
+        self.owners = {export_name: key for key, entry in self.entries.items() for export_name in entry["exports"]}
+
+    def key(self, file_path: str):
+        return os.path.abspath(file_path)
+
+    def signature(self, file_path: str):
+        # The input's file_signature, only hashed again when its size or mtime changed since it was cached
+        return file_signature(file_path, self.entries.get(self.key(file_path)))
+
+    def lookup(self, file_path: str, signature):
+        # Returns the cached export names, or None if the file has to be parsed again
+        entry = self.entries.get(self.key(file_path))
+        if not entry or not signature or entry["hash"] != signature["hash"]:
+            return None
+        for export_name, signature in entry["exports"].items():
+            path = self.export_path(export_name)
+            if not os.path.isfile(path) or file_signature(path, signature)["hash"] != signature["hash"]:
+                return None
+        return list(entry["exports"])
+
+    def export_path(self, export_name: str):
+        return os.path.join(self.output_folder, export_name + ".json")
+
+    def store(self, file_path: str, signature, exports):
+        # Once the exports are written, their signatures are taken from disk
+        key = self.key(file_path)
+        for export_name in exports:
+            owner = self.owners.get(export_name)
+            if owner is not None and owner != key:
+                logger.warning("Export %s of %s overwrote the one of %s", export_name, file_path, owner)
+            self.owners[export_name] = key
+        self.entries[key] = {**signature, "exports": {export_name: file_signature(self.export_path(export_name)) for export_name in exports}}
+
+    def invalidate(self, file_path: str):
+        key = self.key(file_path)
+        for export_name in self.entries.pop(key, {}).get("exports", ()):
+            if self.owners.get(export_name) == key:
+                del self.owners[export_name]
+
+    def save(self):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "files": self.entries}, f, indent=4, ensure_ascii=False)
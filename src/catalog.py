@@ -0,0 +1,94 @@
+import logging
+import os
+import sqlite3
+
+from .uasset import UAsset
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, error TEXT);
+CREATE TABLE IF NOT EXISTS exports (path TEXT, idx INTEGER, name TEXT, class TEXT, size INTEGER);
+CREATE TABLE IF NOT EXISTS imports (path TEXT, idx INTEGER, name TEXT);
+CREATE TABLE IF NOT EXISTS names (path TEXT, name TEXT);
+CREATE INDEX IF NOT EXISTS exports_path ON exports (path);
+CREATE INDEX IF NOT EXISTS exports_name ON exports (name);
+CREATE INDEX IF NOT EXISTS exports_class ON exports (class);
+CREATE INDEX IF NOT EXISTS imports_path ON imports (path);
+CREATE INDEX IF NOT EXISTS imports_name ON imports (name);
+CREATE INDEX IF NOT EXISTS names_path ON names (path);
+CREATE INDEX IF NOT EXISTS names_name ON names (name);
+"""
+
+class AssetCatalog:
+    # SQLite index of what every asset contains, built from headers and tables only (exports are never read)
+    def __init__(self, db_path: str):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def is_current(self, path: str, stat: os.stat_result):
+        row = self.db.execute("SELECT size, mtime FROM files WHERE path = ?", (path,)).fetchone()
+        return row == (stat.st_size, stat.st_mtime_ns)
+
+    def forget(self, path: str):
+        for table in ("files", "exports", "imports", "names"):
+            self.db.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    def scan_file(self, path: str):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if self.is_current(path, stat):
+            return False
+        self.forget(path)
+        error = None
+        asset = UAsset(path)
+        try:
+            asset.init_uasset()
+            name_table = asset.name_table
+            self.db.executemany("INSERT INTO names VALUES (?, ?)", ((path, name) for name in set(name_table)))
+            self.db.executemany("INSERT INTO exports VALUES (?, ?, ?, ?, ?)", (
+                (path, i, asset.fname_to_name(export.ObjectName), f"{export.ObjectClass:x}", export.ObjectSize) # type: ignore
+                for i, export in enumerate(asset.export_table)
+            ))
+            self.db.executemany("INSERT INTO imports VALUES (?, ?, ?)", (
+                (path, i, name_table[entry["NameIndex"]] if entry["NameIndex"] < len(name_table) else None)
+                for i, entry in enumerate(asset.import_table)
+            ))
+        except Exception as e:
+            logger.warning("Couldn't scan %s: %s", path, e)
+            error = str(e)
+        finally:
+            asset.close()
+        self.db.execute("INSERT INTO files VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, error))
+        return True
+
+    def scan(self, paths):
+        # Only new or modified files are read again
+        scanned = 0
+        for path in paths:
+            if not path.endswith(".uasset"):
+                continue
+            scanned += self.scan_file(path)
+        self.db.commit()
+        return scanned
+
+    def select(self, names = (), export_names = (), export_classes = ()):
+        # Paths containing any of the given name table entries, export names or export class ids
+        queries = []
+        params = []
+        for table, column, values in (("names", "name", names), ("exports", "name", export_names), ("exports", "class", export_classes)):
+            if values:
+                queries.append(f"SELECT path FROM {table} WHERE {column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if not queries:
+            return []
+        return [path for path, in self.db.execute(" UNION ".join(queries) + " ORDER BY path", params)]
@@ -1,8 +1,13 @@
 import json
+import logging
 import os
 import re
 from sys import argv
 
+from .output import encode_compact, encode_key, encode_pretty
+
+logger = logging.getLogger(__name__)
+
 character_stuff_re = re.compile(r"(?:Character|Kameo)-?(.+\b)")
 gear_parse_re = re.compile(r"(.+)_Gear(\d+)(?:_(.+))?")
 player_module_re = re.compile(r"(F|B)G_([A-Za-z]+|T1000)(_.+)+")
@@ -116,9 +121,53 @@ RARITIES = {
     "Rarity5": "Ultra Rare"
 }
 
+ROSTER = CHARACTERS | KAMEOS
+
 def parse_rarity(rarity):
     return RARITIES.get(rarity, "Other")
 
+_tag_rules = {} # tag -> (category, is_character_subtag), or None for tags that don't categorize
+_tag_classes = {} # frozenset of tags -> (character, ambiguous, category, is_character_subtag)
+
+def tag_rule(tag):
+    rule = _tag_rules.get(tag, ())
+    if rule == ():
+        category = character_stuff_re.match(tag)
+        if category:
+            rule = (category.group(1), True)
+        elif tag in ALLOWED_CATEGORIES:
+            rule = (tag, False)
+        else:
+            rule = None
+        _tag_rules[tag] = rule
+    return rule
+
+def classify_tags(tags: frozenset):
+    # Character and category implied by an item's tags, computed once per distinct tag set
+    # `ambiguous` names the roster ("character"/"kameo") when several of its members are tagged
+    # A character subtag wins over plain categories, otherwise the last category tag does (tags in sorted order)
+    tag_class = _tag_classes.get(tags)
+    if tag_class is None:
+        character = ambiguous = None
+        for roster, roster_name in ((CHARACTERS, "character"), (KAMEOS, "kameo")):
+            members = roster & tags
+            if len(members) > 1:
+                ambiguous = roster_name
+            elif members:
+                character = next(iter(members))
+            if members:
+                break
+        category, subtag = None, False
+        for tag in sorted(tags):
+            rule = tag_rule(tag)
+            if rule is None:
+                continue
+            category, subtag = rule
+            if subtag:
+                break
+        tag_class = _tag_classes[tags] = (character, ambiguous, category, subtag)
+    return tag_class
+
 if len(argv) > 1:
     in_folder = argv[1]
 else:
@@ -127,166 +176,166 @@ else:
 def combine(in_folder, global_data):
     for root, folders, files in os.walk(in_folder):
         for file in files:
-            print("Parsing file", file, "") # "" for space at the end
+            logger.info("Parsing file %s", file)
             file_path = os.path.join(root, file)
             with open(file_path, encoding="utf-8") as f:
                 data = json.load(f)
-                data = data.get("RowStruct", None) or data.get("LootTable", None)
-                if not data:
-                    print("Not an Inventory File! Skipping...")
-                    continue
-                if data is None:
-                    raise Exception(f"Couldn't determine data type!")
-
-            for item_id, item_dict in data.items():
-                translation_source, translation_id, translation_default = item_dict.get("Title") or [None, None, None]
-                requirement_trans_source, requirement_trans_id, requirement_trans_default = item_dict.get("UnlockRequirement") or [None, None, None]
-                alt_requirements = item_dict.get("ReferencerContexts", [])
-                rarity = item_dict.get("Rarity", {}).get("value", "")
-                rarity = rarity.rsplit("::", 1)[-1]
-                rarity = parse_rarity(rarity)
-
-                max_allowed = item_dict.get("MaxCount", 1)
-
-                bundled_items = item_dict.get("BundledItems", [])
-                bundled_items = [item["RowName"] for item in bundled_items]
-
-                categorized_dict = global_data["OtherCategories"] # Fallback
-                tags = set(item_dict.get("Tags", []))
-                tags |= set(item_dict.get("InternalTags", []))
-                character = item_dict.get("Character", {}).get("RowName")
-
-                if item_id in CHARACTERS | KAMEOS:
-                    # character = item_id
-                    tags.add(item_id)
+            combine_export(file, data, global_data)
+    return global_data
 
-                if not character:
-                    characters = CHARACTERS & tags
-                    if len(characters) > 1:
-                        print(f"Found more than character in item {item_id}!")
-                        exit()
-                    if characters:
-                        character = characters.pop()
+def combine_exports(exports, global_data):
+    # Same as `combine` but fed (export_name, content) straight from the parser, skipping the JSON round trip
+    for export_name, content in exports:
+        logger.info("Parsing export %s", export_name)
+        combine_export(export_name + ".json", content, global_data)
+    return global_data
+
+def place(tree, path, value):
+    for key in path[:-1]:
+        tree = tree.setdefault(key, {})
+    tree[path[-1]] = value
+
+def combine_export(file, data, global_data, contributions = None):
+    # contributions: list receiving (key path in global_data, item) for every item placed, see src/incremental.py
+    data = data.get("RowStruct", None) or data.get("LootTable", None)
+    if not data:
+        logger.info("%s is not an Inventory File! Skipping...", file)
+        return global_data
+    if data is None:
+        raise Exception(f"Couldn't determine data type!")
+
+    for item_id, item_dict in data.items():
+        translation_source, translation_id, translation_default = item_dict.get("Title") or [None, None, None]
+        requirement_trans_source, requirement_trans_id, requirement_trans_default = item_dict.get("UnlockRequirement") or [None, None, None]
+        alt_requirements = item_dict.get("ReferencerContexts", [])
+        rarity = item_dict.get("Rarity", {}).get("value", "")
+        rarity = rarity.rsplit("::", 1)[-1]
+        rarity = parse_rarity(rarity)
+
+        max_allowed = item_dict.get("MaxCount", 1)
+
+        bundled_items = item_dict.get("BundledItems", [])
+        bundled_items = [item["RowName"] for item in bundled_items]
+
+        categorized_dict = global_data["OtherCategories"] # Fallback
+        categorized_path = ("OtherCategories",)
+        tags = frozenset(item_dict.get("Tags", [])).union(item_dict.get("InternalTags", []))
+        character = item_dict.get("Character", {}).get("RowName")
+
+        if item_id in ROSTER:
+            # character = item_id
+            tags |= {item_id}
 
+        tag_character, ambiguous, found_type, subtag = classify_tags(tags)
+        if not character:
+            if ambiguous:
+                logger.error("Found more than %s in item %s!", ambiguous, item_id)
+                exit()
+            character = tag_character
+
+        if character not in tags and character:
+            logger.error("Character %s is not in tags. Undefined behavior! item id %s in file %s", character, item_id, file)
+            exit()
+
+        type_dict = {}
+        if found_type is not None:
+            type_dict = global_data.setdefault(found_type, {})
+            if subtag:
                 if not character:
-                    characters = KAMEOS & tags
-                    if len(characters) > 1:
-                        print(f"Found more than kameo in item {item_id}!")
-                        exit()
-                    if characters:
-                        character = characters.pop()
-
-                if character not in tags and character:
-                    print(f"Warning! Character {character} is not in tags. Undefined behavior!")
-                    print(f"item id {item_id} in file {file}")
-                    exit()
-
-                found_type = None
-                type_dict = {}
-                for tag in tags:
-                    category = character_stuff_re.match(tag)
-                    if category:
-                        category = category.group(1)
-                        type_dict = global_data.setdefault(category, {})
-                        if not character:
-                            print(f"Warning! Character Subtag {category} with no Character!")
-                            character = "OtherCharacter"
-                            # exit()
-                        categorized_dict = type_dict.setdefault(character, {})
-                        found_type = category
-                        break # One tag only
-                    elif tag in ALLOWED_CATEGORIES:
-                        type_dict = global_data.setdefault(tag, {})
-                        if character: # Character stuff or seasonal
-                            category = character
-                        else:
-                            category = "Shared"
-                        categorized_dict = type_dict.setdefault(category, {})
-                        found_type = tag
-                        # break # Allow to be overridden by character tag
-                if found_type is None:
-                    print(f"Item {item_id} has no allowed tags!", tags)
-                    # Replace later with `Other` category
-
-                small_icon = item_dict.get("PreviewIcon", "None")
-                large_icon = item_dict.get("LargePreviewIcon", "None")
-
-                asset = item_dict.get("Asset", "None")
-
-                if found_type == "PlayerModule":
-                    if small_icon == large_icon == "None":
-                        large_icon = item_dict.get("Asset", "None")
-                    found = player_module_re.match(item_id)
-                    if found:
-                        character = found.groups()[1]
-                        categorized_dict = type_dict.setdefault(character, {})
-                elif found_type == "EnvironmentArt":
-                    if small_icon == large_icon == "None":
-                        large_icon = item_dict.get("Asset", "None")
-
-                icons = {
-                    "small": small_icon,
-                    "large": large_icon,
-                }
-
-                color_swatch = item_dict.get("ColorPaletteSwatch", {}).get("Colors")
-
-                # itemSlug = item_id
-                # if len(itemSlug.rsplit(".", 1)) > 1: # Deprecated
-                #     print(itemSlug)
-                #     slug, _id = itemSlug.rsplit(".", 1)
-                #     itemSlug = f"{slug}_{int(_id)-1}"
-                #     # Some Items end with 0.1 to indicate a float so this doesn't work
-
-                object = {
-                    "id": item_id, #{
-                        #"itemSlug": itemSlug,
-                        #"itemId": item_id,
-                    #},
-                    "name": {
-                        "localizationSource": translation_source,
-                        "localizationId": translation_id,
-                        "default": translation_default
-                    },
-                    "unlockRequirements": {
-                        "localizationSource": requirement_trans_source,
-                        "localizationId": requirement_trans_id,
-                        "default": requirement_trans_default,
-                        "altUnlockRequirements": alt_requirements,
-                    },
-                    "rarity": rarity,
-                    "previewImages": icons,
-                    "colors": color_swatch,
-                    "bundledItems": bundled_items,
-                    "max": max_allowed,
-                    "origin": file.split("_", 1)[-1].rsplit("_", 1)[0],
-                    "asset": asset,
-                }
-
-                if found_type == "Gear":
-                    found = gear_parse_re.match(item_id)
-                    if not found:
-                        raise ValueError(f"Couldn't parse gear {item_id}!")
-                    owner_char, gear_id, gear_pattern = found.groups()
-                    categorized_dict.setdefault(gear_id, {})[item_id] = object
-                elif found_type == "Skin":
-                    found = character_skin_re.match(item_id)
-                    if not found:
-                        raise ValueError(f"Couldn't parse skin {item_id}")
-                    owner_char, skin_id, skin_pattern = found.groups()
-                    categorized_dict.setdefault(skin_id, {})[item_id] = object
-                elif found_type == "Taunt":
-                    found = taunt_re.match(item_id)
-                    if found:
-                        owner_char, taunt_type, taunt_id = found.groups()
-                    else:
-                        if "Passive-Bonus" in tags:
-                            taunt_type = "Passive"
-                        else:
-                            raise ValueError(f"Couldn't parse Taunt {item_id}")
-                    categorized_dict.setdefault(taunt_type.title(), {})[item_id] = object
+                    logger.warning("Character Subtag %s with no Character!", found_type)
+                    character = "OtherCharacter"
+                    # exit()
+                categorized_path = (found_type, character)
+            else: # Character stuff or seasonal, allowed to be overridden by a character tag
+                categorized_path = (found_type, character or "Shared")
+            categorized_dict = type_dict.setdefault(categorized_path[1], {})
+        if found_type is None:
+            logger.warning("Item %s has no allowed tags! %s", item_id, tags)
+            # Replace later with `Other` category
+
+        small_icon = item_dict.get("PreviewIcon", "None")
+        large_icon = item_dict.get("LargePreviewIcon", "None")
+
+        asset = item_dict.get("Asset", "None")
+
+        if found_type == "PlayerModule":
+            if small_icon == large_icon == "None":
+                large_icon = item_dict.get("Asset", "None")
+            found = player_module_re.match(item_id)
+            if found:
+                character = found.groups()[1]
+                categorized_dict = type_dict.setdefault(character, {})
+                categorized_path = (found_type, character)
+        elif found_type == "EnvironmentArt":
+            if small_icon == large_icon == "None":
+                large_icon = item_dict.get("Asset", "None")
+
+        icons = {
+            "small": small_icon,
+            "large": large_icon,
+        }
+
+        color_swatch = item_dict.get("ColorPaletteSwatch", {}).get("Colors")
+
+        # itemSlug = item_id
+        # if len(itemSlug.rsplit(".", 1)) > 1: # Deprecated
+        #     print(itemSlug)
+        #     slug, _id = itemSlug.rsplit(".", 1)
+        #     itemSlug = f"{slug}_{int(_id)-1}"
+        #     # Some Items end with 0.1 to indicate a float so this doesn't work
+
+        object = {
+            "id": item_id, #{
+                #"itemSlug": itemSlug,
+                #"itemId": item_id,
+            #},
+            "name": {
+                "localizationSource": translation_source,
+                "localizationId": translation_id,
+                "default": translation_default
+            },
+            "unlockRequirements": {
+                "localizationSource": requirement_trans_source,
+                "localizationId": requirement_trans_id,
+                "default": requirement_trans_default,
+                "altUnlockRequirements": alt_requirements,
+            },
+            "rarity": rarity,
+            "previewImages": icons,
+            "colors": color_swatch,
+            "bundledItems": bundled_items,
+            "max": max_allowed,
+            "origin": file.split("_", 1)[-1].rsplit("_", 1)[0],
+            "asset": asset,
+        }
+
+        if found_type == "Gear":
+            found = gear_parse_re.match(item_id)
+            if not found:
+                raise ValueError(f"Couldn't parse gear {item_id}!")
+            owner_char, gear_id, gear_pattern = found.groups()
+            item_path = (gear_id, item_id)
+        elif found_type == "Skin":
+            found = character_skin_re.match(item_id)
+            if not found:
+                raise ValueError(f"Couldn't parse skin {item_id}")
+            owner_char, skin_id, skin_pattern = found.groups()
+            item_path = (skin_id, item_id)
+        elif found_type == "Taunt":
+            found = taunt_re.match(item_id)
+            if found:
+                owner_char, taunt_type, taunt_id = found.groups()
+            else:
+                if "Passive-Bonus" in tags:
+                    taunt_type = "Passive"
                 else:
-                    categorized_dict[item_id] = object
+                    raise ValueError(f"Couldn't parse Taunt {item_id}")
+            item_path = (taunt_type.title(), item_id)
+        else:
+            item_path = (item_id,)
+        place(categorized_dict, item_path, object)
+        if contributions is not None:
+            contributions.append((categorized_path + item_path, object))
     return global_data
 
 def postprocess_dict(dictionary):
@@ -301,3 +350,36 @@ def postprocess_dict(dictionary):
         return d
     else:
         return dictionary
+
+POSTPROCESS_STREAM_DEPTH = 3 # Levels written key by key, deeper subtrees (one item group) are postprocessed and encoded whole
+
+def is_pruned(obj):
+    # Dicts postprocess_dict drops: empty, or holding only such dicts
+    return isinstance(obj, dict) and all(is_pruned(v) for v in obj.values())
+
+def iter_postprocessed_json(dictionary, compact: bool = False, depth: int = POSTPROCESS_STREAM_DEPTH, indent_level: int = 0):
+    # JSON of postprocess_dict(dictionary) in chunks, without building the processed tree
+    # Output is identical to dump_json(postprocess_dict(dictionary), f, compact)
+    if depth <= 0 or not isinstance(dictionary, dict):
+        dictionary = postprocess_dict(dictionary)
+        yield encode_compact(dictionary) if compact else encode_pretty(dictionary, indent_level)
+        return
+    separator, newline = (":", "") if compact else (": ", "\n" + "    " * (indent_level + 1))
+    empty = True
+    for k, v in sorted(dictionary.items()):
+        if v == "None":
+            v = None
+        elif is_pruned(v):
+            continue
+        yield ("{" if empty else ",") + newline + encode_key(k) + separator
+        empty = False
+        yield from iter_postprocessed_json(v, compact, depth - 1, indent_level + 1)
+    if empty:
+        yield "{}"
+    else:
+        yield newline[:-4] + "}" if newline else "}"
+
+def dump_postprocessed_json(dictionary, f, compact: bool = False):
+    # Streams the postprocessed combine output into `f`, holding one item group's processed copy at a time
+    for chunk in iter_postprocessed_json(dictionary, compact):
+        f.write(chunk)
@@ -0,0 +1,43 @@
+import os
+import zipfile
+
+# Destinations for UAsset's raw/parsed debug dumps. `path` is relative, e.g. `<asset>/Raw/NameTable.uAsset`
+
+class LooseFileSink:
+    # One file per artifact under `folder`, the original layout
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def write(self, path: str, data):
+        path = os.path.join(self.folder, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, str):
+            with open(path, "w") as f:
+                return f.write(data)
+        with open(path, "wb") as f:
+            return f.write(data)
+
+    def close(self):
+        pass
+
+class ZipSink:
+    # Appends every artifact of a process to one archive through a large write buffer, instead of a directory tree
+    def __init__(self, path: str, compression: int = zipfile.ZIP_STORED, buffer_size: int = 1 << 20):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.archive = zipfile.ZipFile(self.file, "w", compression)
+
+    def write(self, path: str, data):
+        self.archive.writestr(path.replace(os.sep, "/"), data)
+        return len(data)
+
+    def close(self):
+        self.archive.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import shutil
+from urllib.parse import quote
+
+from .cache import file_signature, source_version
+from .combine import POSTPROCESS_STREAM_DEPTH, combine_export, is_pruned, iter_postprocessed_json, place
+from .output import encode_key
+
+logger = logging.getLogger(__name__)
+
+COMBINE_SOURCES = ["combine.py", "incremental.py", "output.py"]
+
+class IncrementalCombine:
+    # Persistent combine state in `state_folder`, so a run only re-combines parsed files that were added, changed or removed:
+    #   manifest.json: {"version", "files": {file: {"size", "mtime_ns", "hash", "categories"}}}
+    #   categories/<category>.json: {file: [[key path below the category, item], ...]} in combine order
+    #   categories/<category>.<format>.json: the category's postprocessed JSON, as it appears in the combined output
+    # Only the categories a changed file touches are loaded, rebuilt and encoded again. `write` still copies every
+    # category's stored output into the combined file, which is the one step that grows with the whole catalog.
+    # Where two files place an item at the same path, the one combined last wins, and retracting it restores the other.
+    def __init__(self, state_folder: str, force: bool = False, compact: bool = False):
+        self.state_folder = state_folder
+        self.manifest_path = os.path.join(state_folder, "manifest.json")
+        self.categories_folder = os.path.join(state_folder, "categories")
+        self.version = source_version(COMBINE_SOURCES)
+        self.compact = compact
+        self.files = {}
+        if not force and os.path.isfile(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == self.version:
+                self.files = manifest.get("files", {})
+        if not self.files and os.path.isdir(self.categories_folder): # Stale or forced, nothing in it can be trusted
+            shutil.rmtree(self.categories_folder)
+        os.makedirs(self.categories_folder, exist_ok=True)
+        self.contributions = {} # Loaded categories, category -> {file: items}
+        self.dirty = set()
+
+    def category_path(self, category: str, format: str = ""):
+        return os.path.join(self.categories_folder, quote(category, safe="") + (f".{format}" if format else "") + ".json")
+
+    def output_path(self, category: str):
+        return self.category_path(category, "compact" if self.compact else "indented")
+
+    def category(self, category: str):
+        contributions = self.contributions.get(category)
+        if contributions is None:
+            contributions = {}
+            path = self.category_path(category)
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8") as f:
+                    contributions = json.load(f)
+            self.contributions[category] = contributions
+        return contributions
+
+    def category_names(self):
+        return sorted({category for entry in self.files.values() for category in entry["categories"]})
+
+    def category_tree(self, category: str):
+        tree = {}
+        for items in self.category(category).values():
+            for path, item in items:
+                place(tree, path, item)
+        return tree
+
+    def apply(self, file: str, data, signature = None):
+        # Combines one parsed file (replacing what it contributed before), `signature` as returned by `file_signature`
+        self.retract(file)
+        contributions = []
+        combine_export(os.path.basename(file), data, {"OtherCategories": {}}, contributions)
+        by_category = {}
+        for path, item in contributions:
+            by_category.setdefault(path[0], []).append([list(path[1:]), item])
+        for category, items in by_category.items():
+            self.category(category)[file] = items
+            self.dirty.add(category)
+        self.files[file] = {**(signature or {}), "categories": sorted(by_category)}
+
+    def retract(self, file: str):
+        entry = self.files.pop(file, None)
+        if entry is None:
+            return
+        for category in entry["categories"]:
+            self.category(category).pop(file, None)
+            self.dirty.add(category)
+
+    def update(self, in_folder: str):
+        # Brings the state in line with `in_folder`, returns (applied, retracted) file counts
+        seen = set()
+        applied = 0
+        for root, folders, files in os.walk(in_folder):
+            for file in files:
+                file_path = os.path.join(root, file)
+                key = os.path.relpath(file_path, in_folder)
+                seen.add(key)
+                previous = self.files.get(key)
+                signature = file_signature(file_path, previous)
+                if previous and previous.get("hash") == signature["hash"]:
+                    previous.update(signature) # Touched but unchanged
+                    continue
+                logger.info("Combining %s", key)
+                with open(file_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self.apply(key, data, signature)
+                applied += 1
+        removed = [file for file in self.files if file not in seen]
+        for file in removed:
+            logger.info("Retracting %s", file)
+            self.retract(file)
+        return applied, len(removed)
+
+    def encode_category(self, category: str):
+        # The category's value in the combined output, or "" when postprocessing drops it
+        tree = self.category_tree(category)
+        if is_pruned(tree):
+            return ""
+        return "".join(iter_postprocessed_json(tree, self.compact, POSTPROCESS_STREAM_DEPTH - 1, 1))
+
+    def save(self):
+        for category in self.dirty:
+            for format in ("compact", "indented"): # Encoded again on demand
+                if os.path.isfile(self.category_path(category, format)):
+                    os.remove(self.category_path(category, format))
+            contributions = self.category(category)
+            if not contributions:
+                if os.path.isfile(self.category_path(category)):
+                    os.remove(self.category_path(category))
+                continue
+            with open(self.category_path(category), "w", encoding="utf-8") as f:
+                json.dump(contributions, f, ensure_ascii=False)
+            with open(self.output_path(category), "w", encoding="utf-8") as f:
+                f.write(self.encode_category(category))
+        self.dirty.clear()
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "files": self.files}, f, ensure_ascii=False)
+
+    def write(self, f):
+        # The combined JSON, identical to dump_postprocessed_json(global_data(), f, compact), from the stored category outputs
+        newline = "" if self.compact else "\n    "
+        separator = ":" if self.compact else ": "
+        empty = True
+        for category in self.category_names():
+            path = self.output_path(category)
+            if category in self.dirty or not os.path.isfile(path): # Unsaved, or last saved in the other format
+                with open(path, "w", encoding="utf-8") as out:
+                    out.write(self.encode_category(category))
+            if not os.path.getsize(path):
+                continue
+            f.write(("{" if empty else ",") + newline + encode_key(category) + separator)
+            empty = False
+            with open(path, encoding="utf-8") as chunk:
+                shutil.copyfileobj(chunk, f)
+        f.write("{}" if empty else (newline[:-4] + "}" if newline else "}"))
+
+    def global_data(self):
+        # The whole combined tree, loading every category
+        global_data = {"OtherCategories": {}}
+        for category in self.category_names():
+            global_data[category] = self.category_tree(category)
+        return global_data
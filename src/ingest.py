@@ -0,0 +1,115 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import inspect
+import logging
+import os
+
+from .parse import parse_export
+from .uasset import UAsset
+
+logger = logging.getLogger(__name__)
+
+# asyncio version of main.py's read -> deserialize -> write flow, for slow (network) volumes and async services.
+# Reads and writes run in threads, decoding in an executor, each stage with its own number of workers.
+# Stages are joined by bounded queues, so a slow stage holds back the ones before it instead of buffering everything.
+
+_DONE = object() # One per downstream worker once a stage has finished
+
+def read_asset(file_path: str, memory_map: bool = False):
+    # The whole read stage for one file: header, name table and every export as bytes
+    asset = UAsset(file_path, memory_map=memory_map)
+    try:
+        asset.init_uasset()
+        return asset.name_table, [(file_name, bytes(file_data)) for file_name, file_data in asset.exports]
+    finally:
+        asset.close()
+
+def _decode_file(exports, name_table):
+    # Every export of one file in a single executor call, so its name table is pickled once per file instead of once per export
+    results = []
+    for file_name, file_data in exports:
+        try:
+            results.append((file_name, parse_export(file_name, file_data, name_table), None))
+        except Exception as e:
+            results.append((file_name, None, str(e)))
+    return results
+
+async def ingest(
+    paths, write, read_concurrency: int = 2, decode_concurrency = None, write_concurrency: int = 2,
+    queue_size: int = 16, executor = None, memory_map: bool = False,
+):
+    # write(file_path, export_name, content) runs in a thread, or is awaited when it's a coroutine function
+    # executor: where exports are decoded, a ProcessPoolExecutor(decode_concurrency) owned by this call by default
+    # decode_concurrency: files in flight in the executor, os.cpu_count() by default
+    # Returns read and decode errors in errors.json's format, write errors are raised
+    loop = asyncio.get_running_loop()
+    errors = []
+    path_queue = asyncio.Queue()
+    decode_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    decode_concurrency = decode_concurrency or os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(decode_concurrency)
+
+    for file_path in paths:
+        path_queue.put_nowait(file_path)
+    for _ in range(read_concurrency):
+        path_queue.put_nowait(_DONE)
+
+    async def read_worker():
+        while (file_path := await path_queue.get()) is not _DONE:
+            logger.info("Reading %s", file_path)
+            try:
+                name_table, exports = await asyncio.to_thread(read_asset, file_path, memory_map)
+            except Exception as e:
+                logger.error("Error with %s: %s", file_path, e)
+                errors.append({"file": file_path, "error": str(e)})
+                continue
+            await decode_queue.put((file_path, exports, name_table))
+
+    async def decode_worker():
+        while (item := await decode_queue.get()) is not _DONE:
+            file_path, exports, name_table = item
+            try:
+                results = await loop.run_in_executor(executor, _decode_file, exports, name_table)
+            except Exception as e:
+                logger.error("Error with %s: %s", file_path, e)
+                errors.append({"file": file_path, "error": str(e)})
+                continue
+            for file_name, content, error in results:
+                if error is not None:
+                    logger.error("Error with %s: %s", file_path, error)
+                    errors.append({"file": file_path, "error": error})
+                    continue
+                await write_queue.put((file_path, file_name, content))
+
+    async def write_worker():
+        while (item := await write_queue.get()) is not _DONE:
+            if inspect.iscoroutinefunction(write):
+                await write(*item)
+            else:
+                await asyncio.to_thread(write, *item)
+
+    async def stage(workers, next_queue, next_workers):
+        await asyncio.gather(*workers)
+        for _ in range(next_workers):
+            await next_queue.put(_DONE)
+
+    read_workers = [read_worker() for _ in range(read_concurrency)]
+    decode_workers = [decode_worker() for _ in range(decode_concurrency)]
+    write_workers = [write_worker() for _ in range(write_concurrency)]
+    tasks = [
+        asyncio.ensure_future(stage(read_workers, decode_queue, decode_concurrency)),
+        asyncio.ensure_future(stage(decode_workers, write_queue, write_concurrency)),
+        asyncio.ensure_future(asyncio.gather(*write_workers)),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks: # Only left running when a stage failed
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_executor: # Waits for the workers in a thread, not on the event loop
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+    return errors
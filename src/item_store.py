@@ -0,0 +1,97 @@
+import json
+import sqlite3
+import sys
+
+from .combine import place
+from .output import dump_json, encode_compact
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (path TEXT PRIMARY KEY, id TEXT, category TEXT, character TEXT, grouping TEXT, rarity TEXT, origin TEXT, data TEXT);
+CREATE INDEX IF NOT EXISTS items_id ON items (id);
+CREATE INDEX IF NOT EXISTS items_category ON items (category, character);
+CREATE INDEX IF NOT EXISTS items_character ON items (character);
+CREATE INDEX IF NOT EXISTS items_rarity ON items (rarity);
+CREATE INDEX IF NOT EXISTS items_origin ON items (origin);
+"""
+
+QUERY_COLUMNS = ("id", "category", "character", "grouping", "rarity", "origin")
+
+def iter_items(global_data, path = ()):
+    # (key path, item) for every item of a combined (postprocessed) tree
+    # Items sit at category/item, category/character/item or category/character/grouping/item
+    for key, value in global_data.items():
+        if not isinstance(value, dict):
+            continue
+        if value.get("id") == key and path:
+            yield path + (key,), value
+        else:
+            yield from iter_items(value, path + (key,))
+
+class ItemStore:
+    # SQLite copy of the combined data, one row per item, for lookups without loading the whole JSON
+    def __init__(self, db_path: str):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def write(self, global_data):
+        # Replaces the stored items with `global_data`, as returned by postprocess_dict
+        with self.db:
+            self.db.execute("DELETE FROM items")
+            self.db.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                (
+                    encode_compact(path), item["id"], path[0],
+                    path[1] if len(path) > 2 else None, path[2] if len(path) > 3 else None,
+                    item.get("rarity"), item.get("origin"), encode_compact(item),
+                )
+                for path, item in iter_items(global_data)
+            ))
+        return self.count()
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def find(self, **filters):
+        # Items matching every given column (id, category, character, grouping, rarity, origin), in path order
+        for column in filters:
+            if column not in QUERY_COLUMNS:
+                raise ValueError(f"Can't query items by {column}")
+        where = " AND ".join(f"{column} = ?" for column in filters)
+        query = "SELECT data FROM items" + (f" WHERE {where}" if where else "") + " ORDER BY path"
+        return [json.loads(data) for data, in self.db.execute(query, list(filters.values()))]
+
+    def get(self, item_id: str):
+        items = self.find(id=item_id)
+        return items[0] if items else None
+
+    def values(self, column: str):
+        # Distinct values of a column, e.g. every character
+        if column not in QUERY_COLUMNS:
+            raise ValueError(f"Can't query items by {column}")
+        return [value for value, in self.db.execute(f"SELECT DISTINCT {column} FROM items WHERE {column} IS NOT NULL ORDER BY {column}")]
+
+    def to_dict(self):
+        # The combined tree back, as main.py writes it to combined_data
+        global_data = {}
+        rows = sorted((json.loads(path), data) for path, data in self.db.execute("SELECT path, data FROM items"))
+        for path, data in rows: # Key order of postprocess_dict
+            place(global_data, path, json.loads(data))
+        return global_data
+
+    def export_json(self, f, compact: bool = False):
+        dump_json(self.to_dict(), f, compact)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m src.item_store <items.sqlite> <combined.json>")
+        exit(1)
+    with ItemStore(sys.argv[1]) as store, open(sys.argv[2], "w", encoding="utf-8") as f:
+        store.export_json(f)
@@ -0,0 +1,103 @@
+import json
+import queue
+import threading
+
+try:
+    import orjson # Optional, much faster encoder for compact output
+except ImportError:
+    orjson = None
+
+COMPACT_STREAM_DEPTH = 2 # Containers above this depth are written piece by piece
+
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def encode_compact(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return _compact_encoder.encode(obj)
+
+def encode_key(key) -> str:
+    # Same key coercion as json: only None, bool, int and float become strings, anything else (e.g. an unresolved FNameRef) is refused
+    if not isinstance(key, str):
+        if key is not None and not isinstance(key, (bool, int, float)):
+            raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+        key = _compact_encoder.encode(key)
+    return _compact_encoder.encode(key)
+
+def encode_pretty(obj, indent_level: int = 0) -> str:
+    # Same as json.dumps(indent=4) for a value nested `indent_level` deep (strings never hold raw newlines)
+    return json.dumps(obj, ensure_ascii=False, indent=4).replace("\n", "\n" + "    " * indent_level)
+
+def iter_compact_json(obj, depth = COMPACT_STREAM_DEPTH):
+    # Yields the compact document in chunks, encoding each subtree below `depth` in one shot
+    if depth <= 0 or not isinstance(obj, (dict, list)) or not obj:
+        yield encode_compact(obj)
+        return
+    if isinstance(obj, dict):
+        yield "{"
+        for i, (k, v) in enumerate(obj.items()):
+            yield ("," if i else "") + encode_key(k) + ":"
+            yield from iter_compact_json(v, depth - 1)
+        yield "}"
+    else:
+        yield "["
+        for i, v in enumerate(obj):
+            if i:
+                yield ","
+            yield from iter_compact_json(v, depth - 1)
+        yield "]"
+
+def dumps_json(obj, compact: bool = False) -> str:
+    if compact:
+        return encode_compact(obj)
+    return json.dumps(obj, ensure_ascii=False, indent=4)
+
+def dump_json(obj, f, compact: bool = False):
+    # `compact` streams into the (buffered) handle so the whole document never exists as one string
+    if not compact:
+        return json.dump(obj, f, ensure_ascii=False, indent=4)
+    for chunk in iter_compact_json(obj):
+        f.write(chunk)
+
+
+class BackgroundWriter:
+    # Runs write calls on one thread, in submission order, so encoding and disk I/O overlap with parsing.
+    # At most `max_pending` calls wait in the queue, past that `submit` blocks until the writer catches up.
+    # After a failed call the rest are skipped and the error is raised from the next `submit` or from `close`.
+    def __init__(self, max_pending: int = 64):
+        self.queue = queue.Queue(max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="BackgroundWriter", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                return
+            if self.error is not None:
+                continue
+            func, args = task
+            try:
+                func(*args)
+            except BaseException as e:
+                self.error = e
+
+    def submit(self, func, *args):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((func, args))
+
+    def close(self):
+        # Waits for every queued call
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
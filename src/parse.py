@@ -1,17 +1,30 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
 import os
 
 from .reader import UAssetSerializer
 from .uasset import UAsset
 
-def extract_uasset(file_path: str, dump_raw: bool = False, dump_parsed: bool = False, dump_loc: str = ""):
-    asset = UAsset(file_path, dump_raw, dump_parsed, dump_loc)
-    asset.init_uasset()
-    for file_name, file_data in asset.exports:
-        yield file_name, file_data, asset.name_table
+logger = logging.getLogger(__name__)
 
-def parse_export(file_name, file_data, name_table):
-    print(f"File {file_name} has {len(file_data)} bytes")
-    reader = UAssetSerializer(name_table, file_data)
+def extract_uasset(file_path: str, dump_raw: bool = False, dump_parsed: bool = False, dump_loc: str = "", memory_map: bool = False, dump_sink = None):
+    asset = UAsset(file_path, dump_raw, dump_parsed, dump_loc, memory_map, dump_sink)
+    try:
+        asset.init_uasset()
+        for file_name, file_data in asset.exports:
+            try:
+                yield file_name, file_data, asset.name_table
+            finally:
+                if isinstance(file_data, memoryview): # Slices of the mapping keep it from closing
+                    file_data.release()
+    finally:
+        asset.close()
+
+def parse_export(file_name, file_data, name_table, backend = None, defer_fnames: bool = False):
+    # backend: reader class wrapping bytes exports, UAssetSerializer.CursorReader by default
+    # defer_fnames: FName values are left as FNameRef, resolve them with `resolve_fnames` before output
+    logger.debug("Export %s has %d bytes", file_name, len(file_data))
+    reader = UAssetSerializer(name_table, file_data, backend, defer_fnames)
     export_content = UAssetSerializer.ChainDict()
     
     try:
@@ -21,5 +34,31 @@ def parse_export(file_name, file_data, name_table):
     except Exception as e:
         raise Exception(f"Error at Tell {reader.file_handle.tell()} for {file_name}: {e}")
     
-    print("Parsing Complete")
+    logger.debug("Export %s parsed", file_name)
     return export_content
+
+def resolve_fnames(export_content, name_table):
+    return UAssetSerializer(name_table).resolve_fnames(export_content)
+
+_worker_name_table = []
+
+def _init_export_worker(name_table):
+    global _worker_name_table
+    _worker_name_table = name_table # Sent once per worker instead of once per export
+
+def _parse_export_worker(file_name, file_data):
+    return file_name, parse_export(file_name, file_data, _worker_name_table)
+
+def parse_exports(file_path: str, jobs = None, ordered: bool = True, dump_raw: bool = False, dump_parsed: bool = False, dump_loc: str = "", memory_map: bool = False, dump_sink = None):
+    # Decodes every export of one asset in a process pool, yielding (export_name, content)
+    # In file order when `ordered`, otherwise as soon as each export is done. dict(...) gives results keyed by export name
+    name_table = []
+    exports = []
+    for file_name, file_data, name_table in extract_uasset(file_path, dump_raw, dump_parsed, dump_loc, memory_map, dump_sink):
+        exports.append((file_name, bytes(file_data))) # memoryviews can't be pickled to workers
+
+    with ProcessPoolExecutor(jobs, initializer=_init_export_worker, initargs=(name_table,)) as executor:
+        futures = [executor.submit(_parse_export_worker, file_name, file_data) for file_name, file_data in exports]
+        exports.clear()
+        for future in (futures if ordered else as_completed(futures)):
+            yield future.result()
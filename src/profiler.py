@@ -0,0 +1,63 @@
+import json
+from time import perf_counter
+
+class PropertyProfiler:
+    # Count, bytes consumed and time per property type and per struct type name.
+    # `seconds` includes nested properties, `self_seconds` excludes them.
+    KINDS = ("properties", "structs")
+
+    def __init__(self):
+        self.stats = {kind: {} for kind in self.KINDS} # name -> [count, bytes, seconds, self_seconds]
+        self.child_time = 0.0
+        self.wrapped = {}
+
+    def call(self, kind: str, name: str, handle, func, *args):
+        start_pos = handle.tell()
+        outer_child_time = self.child_time
+        self.child_time = 0.0
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = perf_counter() - start
+            stat = self.stats[kind].get(name)
+            if stat is None:
+                stat = self.stats[kind][name] = [0, 0, 0.0, 0.0]
+            stat[0] += 1
+            stat[1] += handle.tell() - start_pos
+            stat[2] += elapsed
+            stat[3] += elapsed - self.child_time
+            self.child_time = outer_child_time + elapsed
+
+    def wrap(self, kind: str, name: str, reader):
+        # reader(serializer, *args), as stored in UAssetSerializer.PROPERTY_READERS
+        key = (kind, name, reader)
+        wrapped = self.wrapped.get(key)
+        if wrapped is None:
+            def wrapped(serializer, *args):
+                return self.call(kind, name, serializer.file_handle, reader, serializer, *args)
+            self.wrapped[key] = wrapped
+        return wrapped
+
+    def report(self):
+        return {
+            kind: {
+                name: {"count": count, "bytes": size, "seconds": seconds, "self_seconds": self_seconds}
+                for name, (count, size, seconds, self_seconds) in sorted(stats.items(), key=lambda item: -item[1][3])
+            }
+            for kind, stats in self.stats.items()
+        }
+
+    def merge(self, report):
+        # Adds a `report()` from another process
+        for kind, entries in report.items():
+            for name, entry in entries.items():
+                stat = self.stats[kind].setdefault(name, [0, 0, 0.0, 0.0])
+                stat[0] += entry["count"]
+                stat[1] += entry["bytes"]
+                stat[2] += entry["seconds"]
+                stat[3] += entry["self_seconds"]
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4, ensure_ascii=False)
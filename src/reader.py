@@ -1,11 +1,45 @@
+from collections import ChainMap
 from io import BufferedReader, BytesIO
+import logging
 import re
 import struct
+import sys
 from typing import Any, List, Optional, Union
 
 INT_PACK_DICT = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
 FLOAT_PACK_DICT = {4: 'f', 8: 'd'}
 
+# Prebuilt little endian codecs, keyed by (size, signed) for ints and by size for floats
+INT_STRUCTS = {
+    (size, signed): struct.Struct('<' + (pack.lower() if signed else pack))
+    for size, pack in INT_PACK_DICT.items()
+    for signed in (False, True)
+}
+FLOAT_STRUCTS = {size: struct.Struct('<' + pack) for size, pack in FLOAT_PACK_DICT.items()}
+FNAME_STRUCT = struct.Struct('<II')
+PROPERTY_HEADER_STRUCT = struct.Struct('<IIII') # Property name + type FNames
+DATETIME_STRUCT = struct.Struct('<II')
+LINEAR_COLOR_STRUCT = struct.Struct('<4f')
+
+logger = logging.getLogger(__name__)
+
+class FNameRef: # Unresolved FName, kept as name table index + suffix until output
+    # Deliberately not a tuple: json would write a forgotten one as a list, this way encoding it fails
+    __slots__ = ("index", "suffix")
+
+    def __init__(self, index: int, suffix: int):
+        self.index = index
+        self.suffix = suffix
+
+    def __eq__(self, other):
+        return isinstance(other, FNameRef) and self.index == other.index and self.suffix == other.suffix
+
+    def __hash__(self):
+        return hash((FNameRef, self.index, self.suffix))
+
+    def __repr__(self):
+        return f"FNameRef({self.index}, {self.suffix})"
+
 class UAssetSerializer:
 
     SUPPORTED_CLASSES = {
@@ -28,17 +62,19 @@ class UAssetSerializer:
         "Timespan",
     }
 
+    _warned_structs = set()
+
     SUPPORTED_ENUMS = {
         0: "value",
         8: "class",
     }
 
-    _SUPPORTED_READ_MODES = Union[BufferedReader, bytes]
+    _SUPPORTED_READ_MODES = Union[BufferedReader, bytes, memoryview]
 
     INT_PROPERTY_RE = re.compile(r"(U)?Int(\d*)Property")
 
     class ShallowReadIO:
-        def __init__(self, data: bytes):
+        def __init__(self, data: Union[bytes, memoryview]): # memoryview slices stay zero-copy
             self.data = data
             self.cursor: int = 0
             self.size = len(self.data)
@@ -66,7 +102,7 @@ class UAssetSerializer:
             if size == 0:
                 return b""
             if size == -1:
-                data = self.data[self.cursor:]
+                data = self.slice(self.cursor, self.size)
                 self.cursor = self.size
                 return data
             if size < 0:
@@ -74,25 +110,58 @@ class UAssetSerializer:
             if size + self.cursor > self.size:
                 raise ValueError(f"Out of bound while reading {size} bytes from {self.cursor}")
 
-            data = self.data[self.cursor:self.cursor+size]
+            data = self.slice(self.cursor, self.cursor+size)
             self.cursor += size
             return data
 
-    def __init__(self, nametable: List[str] = [], reader: Optional[_SUPPORTED_READ_MODES] = None):
+        def slice(self, start: int, end: int):
+            # Reads from a memoryview are copied: a view slice pins the mapped file for as long as anything holds it, tracebacks included
+            data = self.data[start:end]
+            return data.tobytes() if isinstance(data, memoryview) else data
+
+    class CursorReader(ShallowReadIO):
+        # Same buffer + cursor as ShallowReadIO, but primitives are decoded in place with `unpack_from`
+        def unpack(self, codec: struct.Struct):
+            value, = codec.unpack_from(self.data, self.cursor)
+            self.cursor += codec.size
+            return value
+
+        def unpack_tuple(self, codec: struct.Struct):
+            values = codec.unpack_from(self.data, self.cursor)
+            self.cursor += codec.size
+            return values
+
+    profiler = None # PropertyProfiler from src/profiler.py. Readers are only wrapped while one is set, so it costs nothing otherwise
+
+    def __init__(self, nametable: List[str] = [], reader: Optional[_SUPPORTED_READ_MODES] = None, backend = None, defer_fnames: bool = False):
+        self.defer_fnames = defer_fnames # FName values become FNameRef, see `resolve_fnames`
+        self.nametable = nametable
+        self.fname_cache = {}
+        self.property_reader = self.resolve_property_reader
+        if self.profiler is not None:
+            self.property_reader = self.resolve_profiled_reader
+            read_struct_as_type = self.read_struct_as_type
+            self.read_struct_as_type = lambda struct_type: self.profiler.call("structs", struct_type, self.file_handle, read_struct_as_type, struct_type) # type: ignore
         if nametable:
             self.set_nametable(nametable)
         if reader:
-            self.set_reader(reader)
+            self.set_reader(reader, backend)
 
     def set_nametable(self, nametable):
         self.nametable = nametable
+        # (index, suffix) -> interned name, only valid for this table. A UAsset's NameTable carries one shared by all its exports
+        self.fname_cache = getattr(nametable, "fname_cache", None)
+        if self.fname_cache is None:
+            self.fname_cache = {}
 
-    def set_reader(self, reader: _SUPPORTED_READ_MODES):
+    def set_reader(self, reader: _SUPPORTED_READ_MODES, backend = None):
         self.file_handle: Union[UAssetSerializer.ShallowReadIO, BufferedReader]
-        if isinstance(reader, bytes):
-            self.file_handle = self.ShallowReadIO(reader)
+        if isinstance(reader, (bytes, memoryview)):
+            self.file_handle = (backend or self.CursorReader)(reader)
         else:
             self.file_handle = reader # type: ignore
+        self.unpack = getattr(self.file_handle, "unpack", self.unpack_from_stream)
+        self.unpack_tuple = getattr(self.file_handle, "unpack_tuple", self.unpack_tuple_from_stream)
         self.__init_reader()
 
     def __init_reader(self):
@@ -114,20 +183,42 @@ class UAssetSerializer:
         return self.read_property_once()
 
     def number_to_fname(self, number, suffix = 0):
+        key = (number, suffix)
+        name = self.fname_cache.get(key)
+        if name is not None:
+            return name
         name = self.nametable[number]
         if suffix:
             # Noticed that all items start at 2 instead of 0, so BG_Ashrah.2 is actually BG_Ashrah_1
             name += f"_{suffix-1}"  # Enable if you want
             # name += f".{suffix}" # Enable if you want
+        name = self.fname_cache[key] = sys.intern(name)
         return name
 
+    def resolve_fnames(self, value):
+        # Replaces every FNameRef left by `defer_fnames` with its name, keys included
+        if isinstance(value, FNameRef):
+            return self.number_to_fname(value.index, value.suffix)
+        if isinstance(value, dict):
+            resolved = type(value)()
+            for k, v in value.items():
+                dict.__setitem__(resolved, self.resolve_fnames(k), self.resolve_fnames(v))
+            return resolved
+        if isinstance(value, list):
+            return [self.resolve_fnames(v) for v in value]
+        return value
+
     # Reads
     def read_fname(self):
-        name = self.read_int(4, endianness="le", signed=False)
-        name_suffix = self.read_int(4, endianness="le", signed=False)
+        name, name_suffix = self.unpack_tuple(FNAME_STRUCT)
         name = self.number_to_fname(name, name_suffix)
         return name
 
+    def read_fname_value(self): # For FNames that are data rather than structure, so they can stay unresolved
+        if not self.defer_fnames:
+            return self.read_fname()
+        return FNameRef(*self.unpack_tuple(FNAME_STRUCT))
+
     def read_obj_reference(self):
         ref_idx = self.read_int(4, endianness="le", signed=True)
         ref_name = abs(ref_idx)+1
@@ -143,7 +234,21 @@ class UAssetSerializer:
             name -= 1 # Python rindex
         return self.nametable[name]
 
+    def unpack_from_stream(self, codec: struct.Struct):
+        return codec.unpack(self.file_handle.read(codec.size))[0]
+
+    def unpack_tuple_from_stream(self, codec: struct.Struct):
+        return codec.unpack(self.file_handle.read(codec.size))
+
+    def read_bulk(self, code: str, count: int):
+        # `count` packed little endian elements in one shot
+        data = self.file_handle.read(struct.calcsize(code) * count)
+        return list(struct.unpack(f"<{count}{code}", data))
+
     def read_int(self, size, endianness='le', signed = False):
+        codec = INT_STRUCTS.get((size, signed))
+        if codec is not None:
+            return self.unpack(codec)
         endianness = endianness.lower()
         endianness = '<' if "le" else '>'
         b_size = INT_PACK_DICT.get(size, '')
@@ -152,6 +257,9 @@ class UAssetSerializer:
         return struct.unpack(format_str, data)[0]
 
     def read_float(self, size):
+        codec = FLOAT_STRUCTS.get(size)
+        if codec is not None:
+            return self.unpack(codec)
         format_str = '<' + FLOAT_PACK_DICT.get(size, '')
         data = self.file_handle.read(size)
         return struct.unpack(format_str, data)[0]
@@ -163,7 +271,7 @@ class UAssetSerializer:
             encoding = "utf-16"
         else:
             encoding = "utf-8"
-        string = self.file_handle.read(string_size).decode(encoding)
+        string = str(self.file_handle.read(string_size), encoding) # Also decodes memoryview slices
         ret_str = ''
         for s in string:
             if s == '\x00':
@@ -176,7 +284,7 @@ class UAssetSerializer:
         if property_name == "None":
             property_reference = self.read_int(4)
             if property_reference != 0:
-                print (f"Warning: Encountered Unknown Property `None` with size {property_reference} not 0! Undefined Behavior! Expect Crashes!")
+                logger.warning("Encountered Unknown Property `None` with size %d not 0! Undefined Behavior! Expect Crashes!", property_reference)
                 self.file_handle.seek(-4 -8, 1)
                 # This is very new! I have no idea what this breaks!
             return "", None # Sometimes ObjectProperty has None (0x8), SomeClass (0x4) after it and idk why or when
@@ -199,7 +307,7 @@ class UAssetSerializer:
             byte_type = self.read_fname()
             if byte_type == "None":
                 return self.read_int(1)
-            return self.read_fname()
+            return self.read_fname_value()
         size = self.read_int(8) # idk if this is size or object counts since a byte is one bye lol
         byte_type = self.read_fname()
         _ = self.file_handle.read(1)
@@ -209,7 +317,7 @@ class UAssetSerializer:
             return self.read_int(size)
         if size !=8:
             raise NotImplementedError(f"When byte type is not None, fname is assumed, but fname was not received!")
-        return self.read_fname()
+        return self.read_fname_value()
 
     def read_int_property(self, signed=True, infered_sized = 8, from_array = False,):
         if from_array:
@@ -217,7 +325,7 @@ class UAssetSerializer:
             return value
         size = self.read_int(8)
         if size != infered_sized:
-            print(f"Warning: Int Size was {size} but name indicated a size of {infered_sized}")
+            logger.warning("Int Size was %d but name indicated a size of %d", size, infered_sized)
         _ = self.file_handle.read(1)
         value = self.read_int(size, signed=signed) # When unsigned most of the time it's a bitmap
         return value
@@ -230,11 +338,11 @@ class UAssetSerializer:
 
     def read_enum_property(self, from_array = False):
         if from_array:
-            return self.read_fname()
+            return self.read_fname_value()
         enum_class_id = self.read_int(8)
-        enum_class = self.read_fname()
+        enum_class = self.read_fname_value()
         enum_value_id = self.read_int(1)
-        enum_value = self.read_fname()
+        enum_value = self.read_fname_value()
 
         enum_dict = {enum_class_id: enum_class, enum_value_id: enum_value}
         if len(enum_dict) < 2:
@@ -244,7 +352,7 @@ class UAssetSerializer:
         for enum_type, enum_val in enum_dict.items():
             enum_key = self.SUPPORTED_ENUMS.get(enum_type)
             if enum_key is None:
-                print(f"Warning: Unsupported enum key type {enum_type}")
+                logger.warning("Unsupported enum key type %s", enum_type)
             ret_dict[enum_key] = enum_val
 
         return ret_dict
@@ -287,7 +395,12 @@ class UAssetSerializer:
         cur_tell = self.file_handle.tell()
         elements_count = self.read_int(4)
         values = []
-        if array_type == "StructProperty": # TODO: Needs testing - Update: Testing seems fine
+        bulk_code = self.resolve_bulk_code(array_type)
+        if bulk_code is not None: # Fixed size elements, decoded together
+            values = self.read_bulk(bulk_code, elements_count)
+            if array_type == "BoolProperty":
+                values = [value == 1 for value in values]
+        elif array_type == "StructProperty": # TODO: Needs testing - Update: Testing seems fine
             #     array_struct_name = self.read_fname() # Assert same name as previous fname
             #     array_type = self.read_fname() # Should be the same as the caller, unsure if inside loop or outside
             values = self.read_data_as_type(array_type, loop_count=elements_count, from_array=True)
@@ -311,10 +424,10 @@ class UAssetSerializer:
 
     def read_name_property(self, from_array = False):
         if from_array:
-            return self.read_fname()
+            return self.read_fname_value()
         size = self.read_int(8)
         _ = self.file_handle.read(1)
-        return self.read_fname()
+        return self.read_fname_value()
 
     def read_text_property(self):
         size = self.read_int(8)
@@ -335,7 +448,7 @@ class UAssetSerializer:
         if not from_array:
             size = self.read_int(8)
             _ = self.file_handle.read(1)
-        property_path = self.read_fname()
+        property_path = self.read_fname_value()
         # property_path = [self.read_int(4), self.read_int(4)]
         property_subpath = self.read_int(4)
         return property_path
@@ -354,16 +467,20 @@ class UAssetSerializer:
         if element_name == "RowStruct": # Custom elements
             object_super = self.read_fname()
             file_name = self.read_fname_class() # incorrect
-            print(f"{object_super=} {file_name=}")
+            logger.debug("RowStruct object_super=%s file_name=%s", object_super, file_name)
             root_obj_children_count = self.read_int(4)
-            print("Children Nodes Count:", root_obj_children_count)
+            logger.debug("RowStruct children=%d", root_obj_children_count)
 
             InventoryItems = {}
+            row_layout = () # Learned from the previous row, see `read_table_row`
             for i in range(root_obj_children_count):
                 key_name = self.read_fname()
-                current_dict = self.read_struct_element()
+                if hasattr(self.file_handle, "data"):
+                    current_dict, row_layout = self.read_table_row(row_layout)
+                else:
+                    current_dict = self.read_struct_element()
                 InventoryItems[key_name] = current_dict
-                print("Read object", key_name, "for a total of", len(current_dict), "elements!")
+                logger.debug("Read object %s elements=%d", key_name, len(current_dict))
             return InventoryItems
         elif element_name == "mLootStruct":
             object_super = self.read_fname()
@@ -435,10 +552,11 @@ class UAssetSerializer:
         UNK_Int2 = self.read_int(8)
 
         cur_tell = self.file_handle.tell()
-        print(f"{struct_size=} {struct_type=} (#{struct_dup_id}) {UNK_byte=} {UNK_Int1=} {UNK_Int2=}")
+        logger.debug("Struct struct_size=%d struct_type=%s dup_id=%d UNK_byte=%r UNK_Int1=%d UNK_Int2=%d", struct_size, struct_type, struct_dup_id, UNK_byte, UNK_Int1, UNK_Int2)
 
-        if struct_type not in self.SUPPORTED_STRUCTS:
-            print(f"Warning: Struct Type {struct_type} is not officially supported. Undefined behavior _may_ occur.")
+        if struct_type not in self.SUPPORTED_STRUCTS and struct_type not in self._warned_structs:
+            self._warned_structs.add(struct_type) # Once per type, not per struct
+            logger.warning("Struct Type %s is not officially supported. Undefined behavior _may_ occur.", struct_type)
 
         loop_data = []
         for _ in range(loop_count):
@@ -458,10 +576,7 @@ class UAssetSerializer:
         elif struct_type == "Color":
             return self.read_color_struct_element()
         elif struct_type == "LinearColor":
-            colors = []
-            for _ in range(4):
-                color = self.read_float(4)
-                colors.append(color)
+            colors = list(self.unpack_tuple(LINEAR_COLOR_STRUCT))
             # full_color = f"({', '.join(str(c) for c in colors)})"
             return colors
         elif struct_type == "Timespan":
@@ -488,10 +603,40 @@ class UAssetSerializer:
 
         return value
 
+    def read_table_row(self, row_layout):
+        # Same as `read_struct_element` for in-memory exports, but DataTable rows nearly always share one layout.
+        # While the raw name/type FNames match the previous row's, the handler is called directly (no name resolution or dispatch).
+        # On the first mismatch the rest of the row is read generically and its layout is learned for the next row.
+        value = self.ChainDict()
+        handle = self.file_handle
+        data = handle.data # type: ignore
+        matched = 0
+        for expected, property_name, reader in row_layout:
+            if handle.size - handle.cursor < PROPERTY_HEADER_STRUCT.size or PROPERTY_HEADER_STRUCT.unpack_from(data, handle.cursor) != expected: # type: ignore
+                break
+            handle.cursor += PROPERTY_HEADER_STRUCT.size # type: ignore
+            value[property_name] = reader(self, property_name, 1, False)
+            matched += 1
+
+        learned = list(row_layout[:matched])
+        is_struct_over = self.read_fname()
+        while is_struct_over != "None":
+            self.file_handle.seek(-8, 1) # Undo read
+            header = PROPERTY_HEADER_STRUCT.unpack_from(data, handle.cursor) # type: ignore
+            property_name = self.read_fname()
+            property_type = self.read_fname()
+            reader = self.property_reader(property_type)
+            value[property_name] = reader(self, property_name, 1, False)
+            learned.append((header, property_name, reader))
+            is_struct_over = self.read_fname()
+
+        if matched == len(learned):
+            return value, row_layout
+        return value, tuple(learned)
+
     def read_datetime_struct_element(self):
         value = self.ChainDict()
-        value["date"] = self.read_int(4)
-        value["time"] = self.read_int(4)
+        value["date"], value["time"] = self.unpack_tuple(DATETIME_STRUCT)
         return value
 
     def read_color_struct_element(self):
@@ -537,49 +682,96 @@ class UAssetSerializer:
         paths = []
         paths_count = self.read_int(4)
         for path in range(paths_count):
-            path_name = self.read_fname()
+            path_name = self.read_fname_value()
             paths.append(path_name)
         path_owner_reference = self.read_obj_reference()
-        print(f"FPath with owner {path_owner_reference} had {paths_count} entries!")
+        logger.debug("FPath owner=%s entries=%d", path_owner_reference, paths_count)
         return paths
 
-    def read_data_as_type(self, value_type: str, element_name: Any = "", loop_count = 1, from_array=False): # Element_name is only here for some specific cases, since I couldnt figure it out
-        int_match = self.INT_PROPERTY_RE.match(value_type)
-        if value_type == "TextProperty":
-            value = self.read_text_property()
-        elif value_type == "EnumProperty":
-            value = self.read_enum_property(from_array)
-        elif value_type == "StructProperty":
-            value = self.read_struct_property(loop_count, from_array)
-        elif value_type == "BoolProperty":
-            value = self.read_bool_property(from_array)
-        elif value_type == "ByteProperty":
-            value = self.read_byte_property(from_array)
-        # elif "Int" in value_type and value_type.endswith("Property"):
-        elif int_match:
+    # Property type name -> handler(self, element_name, loop_count, from_array)
+    PROPERTY_READERS = {
+        "TextProperty": lambda self, element_name, loop_count, from_array: self.read_text_property(),
+        "EnumProperty": lambda self, element_name, loop_count, from_array: self.read_enum_property(from_array),
+        "StructProperty": lambda self, element_name, loop_count, from_array: self.read_struct_property(loop_count, from_array),
+        "BoolProperty": lambda self, element_name, loop_count, from_array: self.read_bool_property(from_array),
+        "ByteProperty": lambda self, element_name, loop_count, from_array: self.read_byte_property(from_array),
+        "FloatProperty": lambda self, element_name, loop_count, from_array: self.read_float_property(),
+        "ArrayProperty": lambda self, element_name, loop_count, from_array: self.read_array_property(),
+        "NameProperty": lambda self, element_name, loop_count, from_array: self.read_name_property(from_array),
+        "SoftObjectProperty": lambda self, element_name, loop_count, from_array: self.read_soft_object_property(from_array),
+        "ObjectProperty": lambda self, element_name, loop_count, from_array: self.read_object_property(element_name, from_array),
+        "StrProperty": lambda self, element_name, loop_count, from_array: self.read_string_property(from_array),
+        "MapProperty": lambda self, element_name, loop_count, from_array: self.read_map_property(from_array),
+        "FieldPathProperty": lambda self, element_name, loop_count, from_array: self.read_fieldpath_property(from_array),
+        "None": lambda self, element_name, loop_count, from_array: self.read_none_property(),
+    }
+    _resolved_property_readers = {} # Memoized per type name, cleared on registration
+
+    # Array element type -> struct code for arrays decoded in one shot, (U)IntNProperty are added on resolution
+    BULK_ARRAY_CODES = {
+        "FloatProperty": "f",
+        "BoolProperty": "B",
+    }
+    _resolved_bulk_codes = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._resolved_property_readers = {} # Memos are per class, a subclass may register its own readers
+        cls._resolved_bulk_codes = {}
+
+    @classmethod
+    def register_property_reader(cls, value_type: str, reader):
+        # reader(serializer, element_name, loop_count, from_array) -> value, for `cls` and its subclasses only
+        for table in ("PROPERTY_READERS", "BULK_ARRAY_CODES"):
+            if table not in cls.__dict__: # Own entries on top of the parent's live table, so later parent registrations still apply
+                setattr(cls, table, ChainMap({}, getattr(cls, table)))
+        cls.PROPERTY_READERS[value_type] = reader
+        cls.BULK_ARRAY_CODES[value_type] = None # Registered readers also decode array elements, masks a parent's code
+        classes = [cls]
+        while classes: # Subclasses without their own table resolve through this one
+            klass = classes.pop()
+            klass._resolved_property_readers.clear()
+            klass._resolved_bulk_codes.clear()
+            classes.extend(klass.__subclasses__())
+
+    @classmethod
+    def resolve_bulk_code(cls, value_type: str):
+        if value_type in cls._resolved_bulk_codes:
+            return cls._resolved_bulk_codes[value_type]
+        code = cls.BULK_ARRAY_CODES.get(value_type)
+        if code is None and value_type not in cls.PROPERTY_READERS:
+            int_match = cls.INT_PROPERTY_RE.match(value_type)
+            if int_match:
+                signed, size_ = int_match.groups()
+                code = INT_PACK_DICT.get(int(size_ or 32) // 8)
+                if code and signed != "U":
+                    code = code.lower()
+        cls._resolved_bulk_codes[value_type] = code
+        return code
+
+    @classmethod
+    def resolve_property_reader(cls, value_type: str):
+        reader = cls._resolved_property_readers.get(value_type)
+        if reader is not None:
+            return reader
+        reader = cls.PROPERTY_READERS.get(value_type)
+        if reader is None:
+            int_match = cls.INT_PROPERTY_RE.match(value_type)
+            if not int_match:
+                raise NotImplementedError(f"Value {value_type} is Not Implemented!")
             signed, size_ = int_match.groups()
             signed = signed != "U"
             size_ = int(size_ or 32) // 8
-            value = self.read_int_property(signed=signed, infered_sized=size_, from_array=from_array)
-        elif value_type == "FloatProperty":
-            value = self.read_float_property()
-        elif value_type == "ArrayProperty":
-            value = self.read_array_property()
-        elif value_type == "NameProperty":
-            value = self.read_name_property(from_array)
-        elif value_type == "SoftObjectProperty":
-            value = self.read_soft_object_property(from_array)
-        elif value_type == "ObjectProperty":
-            value = self.read_object_property(element_name, from_array)
-        elif value_type == "StrProperty":
-            value = self.read_string_property(from_array)
-        elif value_type == "MapProperty":
-            value = self.read_map_property(from_array)
-        elif value_type == "FieldPathProperty":
-            value = self.read_fieldpath_property(from_array)
-        elif value_type == "None":
-            print(f"Warning! Should not be possible. Possible corrupt file detected!")
-            return None
-        else:
-            raise NotImplementedError(f"Value {value_type} is Not Implemented!")
-        return value
+            reader = lambda self, element_name, loop_count, from_array: self.read_int_property(signed=signed, infered_sized=size_, from_array=from_array)
+        cls._resolved_property_readers[value_type] = reader
+        return reader
+
+    def resolve_profiled_reader(self, value_type: str):
+        return self.profiler.wrap("properties", value_type, self.resolve_property_reader(value_type)) # type: ignore
+
+    def read_none_property(self):
+        logger.warning("Should not be possible. Possible corrupt file detected!")
+        return None
+
+    def read_data_as_type(self, value_type: str, element_name: Any = "", loop_count = 1, from_array=False): # Element_name is only here for some specific cases, since I couldnt figure it out
+        return self.property_reader(value_type)(self, element_name, loop_count, from_array)
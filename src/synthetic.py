@@ -0,0 +1,178 @@
+import random
+import struct
+
+# Synthetic DataTable assets in the layout UAsset and UAssetSerializer read, for benchmarks without game files
+
+PROPERTY_TYPES = [
+    "IntProperty",
+    "Int64Property",
+    "UInt16Property",
+    "FloatProperty",
+    "BoolProperty",
+    "ByteProperty",
+    "EnumProperty",
+    "NameProperty",
+    "StrProperty",
+    "TextProperty",
+    "SoftObjectProperty",
+    "ObjectProperty",
+    "StructProperty",
+    "ArrayProperty",
+    "MapProperty",
+]
+
+ARRAY_ELEMENT_TYPES = ["IntProperty", "FloatProperty", "BoolProperty", "NameProperty"]
+
+INT_FORMATS = {"IntProperty": "i", "Int64Property": "q", "UInt16Property": "H"}
+
+HEADER_SIZE = 64
+COOKED_HEADER_SIZE = 0x400 # DataLocationInUCas, export locations are relative to it
+
+def pack_fname(index: int, suffix: int = 0):
+    return struct.pack("<II", index, suffix)
+
+class SyntheticAsset:
+    def __init__(self, rows: int = 100, property_mix = PROPERTY_TYPES, array_size: int = 8, map_size: int = 4, name_table_size: int = 256, seed: int = 0):
+        self.rows = rows
+        self.property_mix = list(property_mix)
+        self.array_size = array_size
+        self.map_size = map_size
+        self.random = random.Random(seed)
+
+        base_names = [
+            "None", "ObjectProperty", "RowStruct", "DataTable", "SyntheticItems",
+            "Title", "Rarity", "Tags", "Count", "Skin", "Scorpion", "ERarity", "ERarity::Rarity3",
+            "LinearColor", "/Game/Synthetic/Asset",
+            *PROPERTY_TYPES,
+        ]
+        base_names += [f"{value_type[:-len('Property')]}Value" for value_type in PROPERTY_TYPES]
+        base_names += [f"{value_type[:-len('Property')]}Array" for value_type in ARRAY_ELEMENT_TYPES]
+        base_names += [f"Scorpion_Skin{i:03d}" for i in range(rows)]
+        self.names = list(dict.fromkeys(base_names))
+        self.names += [f"SyntheticName{i}" for i in range(max(0, name_table_size - len(self.names)))]
+        self.name_index = {name: i for i, name in enumerate(self.names)}
+
+    def fname(self, name: str):
+        return pack_fname(self.name_index[name])
+
+    def filler_fname(self):
+        return pack_fname(self.random.randrange(1, len(self.names))) # Never `None`, which ends structs and maps
+
+    # Property bodies, everything after the property's name and type FNames
+    def tagged(self, payload: bytes, size = None):
+        return struct.pack("<Q", len(payload) if size is None else size) + b"\0" + payload
+
+    def string(self, text: str):
+        data = text.encode("utf-8") + b"\0"
+        return struct.pack("<i", len(data)) + data
+
+    def element(self, value_type: str):
+        # Array/map element, without size or padding
+        if value_type in INT_FORMATS:
+            return struct.pack("<" + INT_FORMATS[value_type], self.random.randrange(100))
+        if value_type == "FloatProperty":
+            return struct.pack("<f", self.random.random())
+        if value_type == "BoolProperty":
+            return struct.pack("<B", self.random.randrange(2))
+        if value_type == "NameProperty":
+            return self.filler_fname()
+        raise NotImplementedError(f"No synthetic element for {value_type}")
+
+    def property_body(self, value_type: str, row: int):
+        if value_type in INT_FORMATS:
+            return self.tagged(self.element(value_type))
+        if value_type == "FloatProperty":
+            return self.tagged(self.element(value_type))
+        if value_type == "BoolProperty":
+            return struct.pack("<Q", 0) + self.element(value_type) + b"\0"
+        if value_type == "ByteProperty":
+            return struct.pack("<Q", 1) + self.fname("None") + b"\0" + struct.pack("<B", row & 0xFF)
+        if value_type == "EnumProperty":
+            return struct.pack("<Q", 8) + self.fname("ERarity") + b"\0" + self.fname("ERarity::Rarity3")
+        if value_type == "NameProperty":
+            return self.tagged(self.filler_fname())
+        if value_type == "StrProperty":
+            string = self.string(f"Synthetic string {row}")
+            return self.tagged(string, len(string))
+        if value_type == "TextProperty":
+            text = struct.pack("<HI", 0, 0) + self.string("SyntheticTable") + self.string(f"Item{row}") + self.string(f"Synthetic Item {row}")
+            return struct.pack("<Q", len(text)) + text
+        if value_type == "SoftObjectProperty":
+            return self.tagged(self.fname("/Game/Synthetic/Asset") + struct.pack("<i", 0))
+        if value_type == "ObjectProperty":
+            return self.tagged(struct.pack("<i", 0))
+        if value_type == "StructProperty":
+            color = struct.pack("<4f", *(self.random.random() for _ in range(4)))
+            return struct.pack("<II", len(color), 0) + self.fname("LinearColor") + b"\0" + struct.pack("<QQ", 0, 0) + color
+        if value_type == "ArrayProperty":
+            raise NotImplementedError(f"Arrays are written through `array_property`")
+        if value_type == "MapProperty":
+            elements = b"".join(self.filler_fname() + self.element("IntProperty") for _ in range(self.map_size))
+            payload = struct.pack("<II", 0, self.map_size) + elements
+            return struct.pack("<Q", len(payload)) + self.fname("NameProperty") + self.fname("IntProperty") + b"\0" + payload
+        raise NotImplementedError(f"No synthetic property for {value_type}")
+
+    def array_property(self, name: str, element_type: str, elements):
+        payload = struct.pack("<I", len(elements)) + b"".join(elements)
+        return self.fname(name) + self.fname("ArrayProperty") + struct.pack("<Q", len(payload)) + self.fname(element_type) + b"\0" + payload
+
+    def row(self, row: int):
+        # Inventory-like fields first so `combine` can categorize the rows, then the configured mix
+        data = self.fname("Title") + self.fname("TextProperty") + self.property_body("TextProperty", row)
+        data += self.fname("Rarity") + self.fname("EnumProperty") + self.property_body("EnumProperty", row)
+        data += self.array_property("Tags", "NameProperty", [self.fname("Skin"), self.fname("Scorpion")])
+        for value_type in self.property_mix:
+            if value_type == "ArrayProperty":
+                for element_type in ARRAY_ELEMENT_TYPES:
+                    name = f"{element_type[:-len('Property')]}Array"
+                    data += self.array_property(name, element_type, [self.element(element_type) for _ in range(self.array_size)])
+                continue
+            name = f"{value_type[:-len('Property')]}Value"
+            data += self.fname(name) + self.fname(value_type) + self.property_body(value_type, row)
+        # Never end on a map, its reader peeks one FName past the last element
+        data += self.fname("Count") + self.fname("IntProperty") + self.property_body("IntProperty", row)
+        return self.fname(f"Scorpion_Skin{row:03d}") + data + self.fname("None")
+
+    def export(self):
+        # A DataTable export: `RowStruct` ObjectProperty holding every row, then the closing `None`
+        rows = b"".join(self.row(i) for i in range(self.rows))
+        body = self.fname("DataTable") + struct.pack("<i", -1) + struct.pack("<I", self.rows) + rows
+        data = self.fname("RowStruct") + self.fname("ObjectProperty") + struct.pack("<Q", len(body) + 4) + b"\0" + struct.pack("<i", 0) + body
+        return data + self.fname("None") + struct.pack("<I", 0)
+
+    def uasset(self, exports = 1):
+        export_data = [self.export() for _ in range(exports)]
+        name_table = b"".join(struct.pack(">H", len(name.encode("utf-8"))) + name.encode("utf-8") for name in self.names)
+        import_data = b"\0" * 8
+        table0 = b"\0" * 8
+        table2 = b"\0" * 8
+        imports = struct.pack("<I", 1) + struct.pack("<QQI", 0, self.name_index["DataTable"], 0)
+
+        import_data_offset = HEADER_SIZE + len(name_table)
+        table0_location = import_data_offset + len(import_data)
+        exports_location = table0_location + len(table0)
+        table2_location = exports_location + 72 * exports
+        import_table_offset = table2_location + len(table2)
+
+        export_table = b""
+        location = COOKED_HEADER_SIZE
+        for data in export_data:
+            export_table += struct.pack("<QQQQQQ16sQ", location, len(data), self.name_index["SyntheticItems"], 0, 0, 0, b"\0" * 16, 0)
+            location += len(data)
+
+        header = struct.pack(
+            "<QQIIIIIIIIIIQ",
+            0, 0, 0, COOKED_HEADER_SIZE, HEADER_SIZE, len(name_table), import_data_offset, len(import_data),
+            table0_location, exports_location, table2_location, import_table_offset, len(imports),
+        )
+        return header + name_table + import_data + table0 + export_table + table2 + imports + b"".join(export_data)
+
+    def write(self, path: str, exports = 1):
+        with open(path, "wb") as f:
+            f.write(self.uasset(exports))
+        return path
+
+    def write_export(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.export())
+        return path
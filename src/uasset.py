@@ -1,12 +1,20 @@
+import logging
+import mmap
 import os
 import struct as structdata
 from typing import List, Tuple, TypeVar, overload
 import uuid
 
+from .dumps import LooseFileSink
+
 from test.pythoninfo import dump_info
 
 _T = TypeVar("_T")
 
+logger = logging.getLogger(__name__)
+
+NAME_SIZE_STRUCT = structdata.Struct(">H")
+
 
 class Struct:
     SIZE_FORMATS = {
@@ -87,6 +95,42 @@ class StructSpawn(Struct):
         return self.param(p)
 
 
+class StructRecord:
+    # Fixed-layout table row decoded in bulk with `iter_unpack`, readable like StructSpawn (`entry.Field` or `entry["Field"]`)
+    __slots__ = ()
+    params = []
+    _record_struct = None
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def record_struct(cls) -> structdata.Struct:
+        if cls.__dict__.get("_record_struct") is None:
+            cls._record_struct = structdata.Struct("<" + "".join(
+                Struct.SIZE_FORMATS.get(size, f"{size}s") for _, size in cls.params
+            ))
+        return cls._record_struct # type: ignore
+
+    @classmethod
+    def unpack_many(cls, data: bytes):
+        return [cls(*values) for values in cls.record_struct().iter_unpack(data)]
+
+    @classmethod
+    def read_many(cls, file_handle, count: int):
+        return cls.unpack_many(file_handle.read(count * cls.record_struct().size))
+
+    def param(self, p):
+        return getattr(self, p)
+
+    def __getitem__(self, p):
+        return self.param(p)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+
 class UAssetHeader(StructSpawn):
     params = [
         (
@@ -108,7 +152,7 @@ class UAssetHeader(StructSpawn):
     ]
 
 
-class ExportTableEntry(StructSpawn):
+class ExportTableEntry(StructRecord):
     params = [
         ("ObjectLocation", 8),
         ("ObjectSize", 8),
@@ -119,6 +163,7 @@ class ExportTableEntry(StructSpawn):
         ("ObjectClassSignature", 16),
         ("ObjectClass", 8),
     ]
+    __slots__ = tuple(name for name, _ in params)
 
     def __str__(self, name_table: List[str]):
         offset = self["ObjectLocation"]
@@ -139,12 +184,13 @@ class ExportTableEntry(StructSpawn):
         s = f"{offset:X} ({size:X}): {name} ({class_:X}) [{unk1:X} | {unk2:X} | {unk3:X}] [{guid}]"
         return s
 
-class ImportTableEntry(StructSpawn):
+class ImportTableEntry(StructRecord):
     params = [
         ("UnknownHash", 8),
         ("NameIndex", 8),
         ("UNK", 4),
     ]
+    __slots__ = tuple(name for name, _ in params)
     
     def __str__(self, name_table: List[str]):
         hash_ = self["UnknownHash"]
@@ -155,6 +201,13 @@ class ImportTableEntry(StructSpawn):
         return s
 
 
+class NameTable(list):
+    # One asset's names, plus the (index, suffix) -> interned name cache every UAssetSerializer of the asset shares
+    def __init__(self, names = ()):
+        super().__init__(names)
+        self.fname_cache = {}
+
+
 class FName:
     def __init__(self, length, string):
         self.length = length
@@ -162,31 +215,48 @@ class FName:
 
 
 class UAsset:
-    def __init__(self, f, dump_raw: bool = False, dump_parsed: bool = False, dump_folder: str = ""):
+    def __init__(self, f, dump_raw: bool = False, dump_parsed: bool = False, dump_folder: str = "", memory_map: bool = False, dump_sink = None):
         if isinstance(f, str):
             self.file_name = os.path.basename(f)  # Get only the file name from the full path
             f = open(f, "rb")
         else:
             self.file_name = os.path.basename(f.name)  # Get only the file name from the open file object
 
+        self.file = f
+        self.view = None
+        if memory_map: # Exports become zero-copy memoryview slices of the mapping
+            f = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(f)
+
         self.file_handle = f
         self.dump_raw_flag = dump_raw
         self.dump_parsed_flag = dump_parsed
-        if (self.dump_raw or self.dump_parsed) and not dump_folder:
-            print(f"Defaulting dump folder to `extracted` since value was empty")
+        if (self.dump_raw_flag or self.dump_parsed_flag) and not dump_folder and dump_sink is None:
+            logger.warning("Defaulting dump folder to `extracted` since value was empty")
             dump_folder = "extracted"
         self.dump_folder = dump_folder
+        self.dump_sink = dump_sink or LooseFileSink(dump_folder) # See src/dumps.py for archive sinks
+
+    def close(self):
+        # Any memoryview handed out by `exports` must be released before the mapping can close
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        try:
+            self.file_handle.close()
+        except BufferError as e: # A slice is still referenced somewhere, the mapping goes once it's collected
+            logger.warning("Couldn't unmap %s: %s", self.file_name, e)
+        finally:
+            if self.file_handle is not self.file:
+                self.file.close()
 
     def get_dump_location(self, *path):
-        dump = os.path.join(self.dump_folder, self.file_name, *path)
-        os.makedirs(os.path.dirname(dump), exist_ok=True)
-        return dump
+        return os.path.join(self.file_name, *path) # Relative to the dump sink
 
     def dump_raw(self, obj, *path, extension=".uAsset"):
         path = self.get_dump_location("Raw", *path)
         path += extension
-        with open(path, "wb") as f:
-            return f.write(obj)
+        return self.dump_sink.write(path, obj)
 
     def dump_parsed(self, obj, *path, enum="hex", extension=".txt"):
         path = self.get_dump_location("Parsed", *path)
@@ -198,17 +268,18 @@ class UAsset:
         else:
             format = "{i:0>2X}: {v}"
 
-        with open(path, "w") as f:
-            if not hasattr(obj, "__iter__"):
-                obj = str(obj).split("\n")
-            i = 0
-            for i, line in enumerate(obj):
-                try:
-                    line = line.__str__(self.name_table) # type: ignore
-                except Exception:
-                    line = str(line)
-                line = format.format(i=i, v=line)
-                f.write(line + "\n")
+        lines = []
+        if not hasattr(obj, "__iter__"):
+            obj = str(obj).split("\n")
+        i = 0
+        for i, line in enumerate(obj):
+            try:
+                line = line.__str__(self.name_table) # type: ignore
+            except Exception:
+                line = str(line)
+            line = format.format(i=i, v=line)
+            lines.append(line + "\n")
+        self.dump_sink.write(path, "".join(lines))
         return i
 
     def get_header(self, header):
@@ -217,7 +288,7 @@ class UAsset:
     def init_uasset(self):
         self.header = UAssetHeader(self.file_handle).read()
 
-        self.name_table = list(self.read_name_table())
+        self.name_table = self.read_name_table()
 
         self.file_handle.seek(self.get_header("ImportDataOffset"))
         self.import_data = self.file_handle.read(self.get_header("ImportDataSize"))
@@ -225,11 +296,11 @@ class UAsset:
         self.table0 = self.file_handle.read(
             self.get_header("ExportsLocation") - self.get_header("Table0Location")
         )
-        self.export_table = list(self.read_exports_table())
+        self.export_table = self.read_exports_table()
         self.table2 = self.file_handle.read(
             self.get_header("ImportTableOffset") - self.get_header("Table2Location")
         )
-        self.import_table = list(self.read_imports_table())
+        self.import_table = self.read_imports_table()
         # self.import_table = self.file_handle.read(self.get_header("ImportTableSize"))
 
         if self.dump_raw_flag:
@@ -250,53 +321,94 @@ class UAsset:
         yield from self.read_exports()
 
     def read_name_table(self):
-        cur_tell = self.file_handle.tell()
-        while self.file_handle.tell() - cur_tell < self.get_header("NameTableSize"):
-            name_size = self.read([2])[0]
-            name_size = int.from_bytes(
-                name_size.to_bytes(2, byteorder="little"), byteorder="big" # type: ignore
-            )
-            name = self.read(name_size).decode("utf-8")
-            yield name
+        # One read for the whole table, then split in a single pass
+        block = self.file_handle.read(self.get_header("NameTableSize"))
         if self.dump_raw_flag:
-            done_tell = self.file_handle.tell()
-            self.file_handle.seek(cur_tell)
-            self.dump_raw(self.file_handle.read(done_tell-cur_tell), "NameTable")
+            self.dump_raw(block, "NameTable")
+        return self.split_name_table(block)
+
+    @staticmethod
+    def split_name_table(block: bytes):
+        names = NameTable()
+        unpack_size = NAME_SIZE_STRUCT.unpack_from
+        cursor = 0
+        end = len(block)
+        while cursor < end:
+            name_size, = unpack_size(block, cursor) # Big endian
+            cursor += 2
+            names.append(block[cursor:cursor+name_size].decode("utf-8"))
+            cursor += name_size
+        return names
 
     def read_exports_table(self):
         size = self.get_header("Table2Location") - self.get_header("ExportsLocation")
-        cur_tell = self.file_handle.tell()
-        while self.file_handle.tell() - cur_tell < size:
-            yield ExportTableEntry(self.file_handle).read()
+        record_size = ExportTableEntry.record_struct().size
+        count = -(-size // record_size) # Whole entries covering the table
+        data = self.file_handle.read(count * record_size)
         if self.dump_raw_flag:
-            done_tell = self.file_handle.tell()
-            self.file_handle.seek(cur_tell)
-            self.dump_raw(self.file_handle.read(done_tell-cur_tell), "ExportTable")
+            self.dump_raw(data, "ExportTable")
+        return ExportTableEntry.unpack_many(data)
 
     def read_imports_table(self):
         size = self.header["ImportTableSize"]
         loc = self.header["ImportTableOffset"]
         imports_count = int.from_bytes(self.read(4), "little")
-        for _ in range(imports_count):
-            yield ImportTableEntry(self.file_handle).read()
+        import_table = ImportTableEntry.read_many(self.file_handle, imports_count)
         assert self.file_handle.tell() - loc == size # Make sure I read correctly
         
         if self.dump_raw_flag:
             self.file_handle.seek(loc)
             self.dump_raw(self.file_handle.read(size), "ImportTable")
+        return import_table
 
     def read_exports(self):
+        self.file_handle.seek(self.get_exports_offset()) # Random access lookups may have moved the cursor
         for i, export in enumerate(self.export_table):
             size: int = export.ObjectSize  # type: ignore
-            # file_location: int = export.ObjectLocation - self.get_header("DataLocationInUCas") # type: ignore
+            file_name = self.get_export_file_name(i)
 
-            file_name = f"{i}_{self.fname_to_name(export.ObjectName)}_{export.ObjectClass:x}"  # type: ignore
-
-            data = self.read(size)
+            data = self.read_view(size)
             if self.dump_raw_flag:
                 self.dump_raw(data, "Exports", file_name, extension="")
             yield file_name, data
 
+    def get_exports_offset(self): # Export data follows the import table
+        return self.get_header("ImportTableOffset") + self.get_header("ImportTableSize")
+
+    def get_export_location(self, index: int):
+        export = self.export_table[index]
+        return self.get_exports_offset() + export.ObjectLocation - self.get_header("DataLocationInUCas") # type: ignore
+
+    def get_export_file_name(self, index: int):
+        export = self.export_table[index]
+        return f"{index}_{self.fname_to_name(export.ObjectName)}_{export.ObjectClass:x}"  # type: ignore
+
+    def find_export_indices(self, name = None, class_ = None):
+        # name matches either the export's own name or its `exports` file name, class_ is the ObjectClass id
+        for i, export in enumerate(self.export_table):
+            if name is not None and name not in (self.fname_to_name(export.ObjectName), self.get_export_file_name(i)):
+                continue
+            if class_ is not None and export.ObjectClass != class_:
+                continue
+            yield i
+
+    def read_export(self, index: int):
+        # Seeks straight to one export and reads only its range
+        self.file_handle.seek(self.get_export_location(index))
+        return self.get_export_file_name(index), self.read_view(self.export_table[index].ObjectSize) # type: ignore
+
+    def get_export(self, key):
+        # By index, or by the first export with that name
+        if isinstance(key, int):
+            return self.read_export(key)
+        for i in self.find_export_indices(name=key):
+            return self.read_export(i)
+        raise KeyError(f"No export named {key} in {self.file_name}")
+
+    def find_exports(self, name = None, class_ = None):
+        for i in self.find_export_indices(name, class_):
+            yield self.read_export(i)
+
     def read_struct(self, struct):
         if not isinstance(struct[0], (list, tuple)):
             return Struct.read_raw(struct, self.file_handle)
@@ -313,18 +425,24 @@ class UAsset:
             return self.read_struct(size)
         return self.file_handle.read(size, *args, **kwargs)
 
+    def read_view(self, size: int):
+        if self.view is None:
+            return self.read(size)
+        start = self.file_handle.tell()
+        self.file_handle.seek(size, 1)
+        return self.view[start:start+size]
+
     def fname_to_name(self, fname):
         return self.name_table[fname]
 
 
-if __name__ == "__main__":
-    try:
-        # f = "services/MK12UAssetExtractor/src/SubZero_Fatalities.uasset"
-        f = ""
-        d = UAsset(f).init_uasset()
-    except FileNotFoundError:
-        # f = "SubZero_Fatalities.uasset"
-        # f = "Announcer_SeasonOfSoulEater.uasset"
-        f = "MavadoKAM_Kameo.uasset"
+if __name__ == "__main__": # python -m src.uasset [file]
+    import sys
+    import tempfile
+    if len(sys.argv) > 1:
+        d = UAsset(sys.argv[1]).init_uasset()
+    else: # No game files ship with the repo, so inspect a synthetic one
+        from .synthetic import SyntheticAsset
+        f = SyntheticAsset(rows=4).write(os.path.join(tempfile.mkdtemp(), "Synthetic.uasset"))
         d = UAsset(f).init_uasset()
     print(dict(d.exports))